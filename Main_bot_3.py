@@ -32,7 +32,7 @@
 from discord import ButtonStyle
 from datetime import datetime, timedelta, timezone
 import sqlite3
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, List, Tuple, NamedTuple
 import io
 import platform
 import discord
@@ -46,6 +46,16 @@ from dotenv import load_dotenv
 import json
 import aiohttp
 import copy
+import shutil
+import bisect
+import contextlib
+import hashlib
+import itertools
+import tempfile
+from collections import deque, OrderedDict
+import re
+import unicodedata
+import urllib.parse
 
 load_dotenv()
 ZygnalBot_Version = "V7.3.4 | BETA"
@@ -105,11 +115,22 @@ class ZygnalBot(commands.Bot):
 
 
     async def setup_hook(self):
+        # once per process; on_ready fires again after every reconnect
+        self.webhook_logger = WebhookLogger(self)
+        await self.webhook_logger.start()
         await self.setup_cogs()
         await self.tree.sync()
 
+    async def close(self):
+        try:
+            await super().close()  # stop the gateway before the spool closes
+        finally:
+            # handlers already dispatched can still run, so they must find no logger rather than a closed one
+            webhook_logger, self.webhook_logger = self.webhook_logger, None
+            if webhook_logger:
+                await webhook_logger.close()
+
     async def on_ready(self):
-        self.webhook_logger = WebhookLogger(self)
         print(f'🚀 {self.user} The Owl is Online!')
         await self.setup_status_task()
 
@@ -147,12 +168,12 @@ class ZygnalBot(commands.Bot):
 
     async def on_message(self, message):
         if self.webhook_logger:
-            await self.webhook_logger.log_message(message)
+            self.webhook_logger.log_message(message)
         await self.process_commands(message)
 
     async def on_command(self, ctx):
         if self.webhook_logger:
-            await self.webhook_logger.log_command(ctx)
+            self.webhook_logger.log_command(ctx)
 
 bot = ZygnalBot()
 
@@ -1036,6 +1057,10 @@ class VerificationSystem(commands.Cog):
         if member.bot:
             return
 
+        server_management = self.bot.get_cog("ServerManagement")
+        if server_management and server_management.raid_kick_pending(member):
+            return  # raid protection is already kicking this account
+
         settings = self.pending_verifications[member.guild.id]
         
         if not settings.get("level"):
@@ -1102,10 +1127,12 @@ class VerificationSystem(commands.Cog):
         )
         embed.set_thumbnail(url=member.guild.icon.url if member.guild.icon else None)
         
-        try:
-            await member.send(embed=embed)
-        except discord.Forbidden:
-            pass
+        server_management = self.bot.get_cog("ServerManagement")
+        if not (server_management and server_management.in_raid_mode(member.guild.id)):  # no DMs during a raid
+            try:
+                await member.send(embed=embed)
+            except discord.Forbidden:
+                pass
         
         await self.log_verification_attempt(member, False, reason)
         await member.kick(reason=f"Failed verification: {reason}")
@@ -1136,22 +1163,721 @@ class VerificationSystem(commands.Cog):
 def setup(bot):
     bot.add_cog(VerificationSystem(bot))
 
+class WriteBehindStore:
+    """Coalesces JSON saves and writes them atomically from a background task."""
+
+    def __init__(self, path: str, snapshot, flush_interval: float = 30, max_dirty: int = 500, encode=None):
+        self.path = path
+        self.snapshot = snapshot                 # callable returning the data to dump, sharing nothing the loop mutates in place
+        self.encode = encode                     # optional coroutine (dirty keys) -> bytes that re-encodes only what changed
+        self.flush_interval = flush_interval     # seconds between timed flushes
+        self.max_dirty = max_dirty               # dirty entries that force an early flush
+        self.dirty = set()
+        self.bytes_written = 0
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = None
+
+    def mark_dirty(self, key=None):
+        """Record a changed entry; the next flush persists it."""
+        self.dirty.add(key)
+        if len(self.dirty) >= self.max_dirty:
+            self._wake.set()
+
+    def start(self, loop):
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Serialize and write the file from worker threads; on any failure the keys stay dirty for the next flush."""
+        if not self.dirty:
+            return
+        async with self._lock:
+            dirty, self.dirty = self.dirty, set()
+            try:
+                if self.encode:
+                    payload = await self.encode(dirty)
+                else:
+                    payload = await asyncio.to_thread(self.encode_json, self.snapshot())
+                await asyncio.to_thread(self._write, payload)
+            except Exception as e:  # an encoding bug must not end the flush loop and silently stop persistence
+                print(f"Failed to save {self.path}: {e}")
+                self.dirty |= dirty
+
+    @staticmethod
+    def encode_json(data) -> bytes:
+        return json.dumps(data).encode()
+
+    def _write(self, payload: bytes):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.bytes_written += len(payload)
+
+    async def close(self):
+        """Stop the background task and flush whatever is still pending."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+USER_ID_SPAN = 1 << 64  # Discord snowflakes fit in 64 bits
+
+
+class LeaderboardIndex:
+    """One guild's users kept sorted by XP, so ranks and top-N never need a full sort.
+
+    Each entry is a single int encoding (-xp, user_id), which sorts by XP descending and
+    then by user ID without allocating a tuple per user. Keys live in sorted blocks of
+    about BLOCK_SIZE entries so an update only shifts one block, not the whole guild.
+    """
+
+    BLOCK_SIZE = 1000
+
+    def __init__(self, entries=None):
+        keys = sorted(self.key(xp, user_id) for user_id, xp in entries or ())
+        self.blocks: List[List[int]] = [keys[i:i + self.BLOCK_SIZE] for i in range(0, len(keys), self.BLOCK_SIZE)]
+        self.maxes: List[int] = [block[-1] for block in self.blocks]
+        self.size = len(keys)
+
+    def __len__(self):
+        return self.size
+
+    @staticmethod
+    def key(xp: int, user_id: int) -> int:
+        return -xp * USER_ID_SPAN + user_id
+
+    def update(self, user_id: int, old_xp: Optional[int], new_xp: int):
+        if old_xp == new_xp:
+            return
+        if old_xp is not None:
+            self.remove(user_id, old_xp)
+        self.insert(self.key(new_xp, user_id))
+
+    def insert(self, key: int):
+        if not self.blocks:
+            self.blocks.append([key])
+            self.maxes.append(key)
+            self.size = 1
+            return
+        i = min(bisect.bisect_left(self.maxes, key), len(self.blocks) - 1)
+        block = self.blocks[i]
+        bisect.insort(block, key)
+        self.maxes[i] = block[-1]
+        if len(block) > 2 * self.BLOCK_SIZE:
+            self.blocks[i:i + 1] = [block[:self.BLOCK_SIZE], block[self.BLOCK_SIZE:]]
+            self.maxes[i:i + 1] = [block[self.BLOCK_SIZE - 1], block[-1]]
+        self.size += 1
+
+    def remove(self, user_id: int, xp: int):
+        key = self.key(xp, user_id)
+        i = bisect.bisect_left(self.maxes, key)
+        if i == len(self.blocks):
+            return
+        block = self.blocks[i]
+        j = bisect.bisect_left(block, key)
+        if j < len(block) and block[j] == key:
+            del block[j]
+            self.size -= 1
+            if block:
+                self.maxes[i] = block[-1]
+            else:
+                del self.blocks[i]
+                del self.maxes[i]
+
+    def rank(self, user_id: int, xp: int) -> int:
+        """1-based position of the user, ties broken by user ID."""
+        key = self.key(xp, user_id)
+        i = bisect.bisect_left(self.maxes, key)
+        position = sum(len(block) for block in self.blocks[:i])
+        if i < len(self.blocks):
+            position += bisect.bisect_left(self.blocks[i], key)
+        return position + 1
+
+    def top(self, limit: int, offset: int = 0) -> List[Tuple[int, int]]:
+        result = []
+        for block in self.blocks:
+            if len(result) >= limit:
+                break
+            if offset >= len(block):
+                offset -= len(block)
+                continue
+            result.extend((key % USER_ID_SPAN, -(key // USER_ID_SPAN)) for key in block[offset:offset + limit - len(result)])
+            offset = 0
+        return result
+
+
+DECAY_GRACE_DAYS = 7  # days without a message before XP starts to decay
+
+
+def to_epoch(value) -> int:
+    """Convert a stored last_message (legacy ISO string or epoch seconds) to epoch seconds."""
+    if isinstance(value, str):
+        return int(datetime.fromisoformat(value).timestamp())
+    return int(value)
+
+
+def owed_decay_steps(last_message: int, decay_steps: int, now: int) -> int:
+    """Daily decay steps a user has accrued since their last message but not yet had applied."""
+    inactive_days = (now - last_message) // 86400
+    return max(0, inactive_days - DECAY_GRACE_DAYS - decay_steps)
+
+
+def legacy_decay_steps(last_message: int, now: int) -> int:
+    """Steps the old daily loop already applied to a record saved before decay_steps existed."""
+    return max(0, (now - last_message) // 86400 - DECAY_GRACE_DAYS)
+
+
+def decay_xp(xp: int, rate: float, steps: int) -> int:
+    """Apply steps days of decay, truncating after each day exactly like the daily loop did."""
+    for _ in range(steps):
+        if xp <= 0:
+            break
+        xp = int(xp * (1 - rate))
+    return max(0, xp)
+
+
+class LevelRecord:
+    """Compact per-user leveling state. achievements is a bitmask over the guild's achievement table."""
+
+    __slots__ = ('xp', 'last_message', 'decay_steps', 'achievements')
+
+    def __init__(self, xp: int = 0, last_message: int = 0, decay_steps: int = 0, achievements: int = 0):
+        self.xp = xp
+        self.last_message = last_message    # epoch seconds
+        self.decay_steps = decay_steps
+        self.achievements = achievements
+
+
+class JSONLevelingBackend:
+    """Keeps every guild's leveling records in memory; saved as part of leveling_data.json."""
+
+    transactional = False  # writes made before a failure stay applied
+
+    def __init__(self, decay_rate: float = 0.01, lazy_decay: bool = True):
+        self.user_data: Dict[int, Dict[int, LevelRecord]] = {}  # {guild_id: {user_id: record}}
+        self.leaderboards: Dict[int, LeaderboardIndex] = {}
+        self.achievement_bits: Dict[int, Dict[str, int]] = {}   # {guild_id: {name: bit}}
+        self.decay_rate = decay_rate
+        self.lazy_decay = lazy_decay
+        self.activity_days: Dict[int, Dict[int, set]] = {}     # {day number: {guild_id: {user_id}}}
+
+    def load(self, raw_user_data: dict):
+        now = int(time.time())
+        self.user_data = {}
+        self.achievement_bits = {}
+        for guild_id, guild_data in raw_user_data.items():
+            guild_id = int(guild_id)
+            users = self.user_data[guild_id] = {}
+            for user_id, data in guild_data.items():
+                achievements = 0
+                for name in data.get('achievements', []):
+                    achievements |= self.achievement_bit(guild_id, name)
+                last_message = to_epoch(data.get('last_message', now))
+                users[int(user_id)] = LevelRecord(
+                    data.get('xp', 0),
+                    last_message,
+                    data['decay_steps'] if 'decay_steps' in data else legacy_decay_steps(last_message, now),
+                    achievements
+                )
+        self.leaderboards = {
+            guild_id: LeaderboardIndex((user_id, record.xp) for user_id, record in users.items())
+            for guild_id, users in self.user_data.items()
+        }
+        self.activity_days = {}
+        if self.lazy_decay:
+            for guild_id, users in self.user_data.items():
+                for user_id, record in users.items():
+                    self.mark_active(guild_id, user_id, record.last_message)
+
+    def leaderboard(self, guild_id: int) -> LeaderboardIndex:
+        if guild_id not in self.leaderboards:
+            self.leaderboards[guild_id] = LeaderboardIndex()
+        return self.leaderboards[guild_id]
+
+    def achievement_bit(self, guild_id: int, name: str) -> int:
+        bits = self.achievement_bits.setdefault(guild_id, {})
+        if name not in bits:
+            bits[name] = 1 << len(bits)
+        return bits[name]
+
+    def achievement_names(self, guild_id: int, mask: int) -> List[str]:
+        return [name for name, bit in self.achievement_bits.get(guild_id, {}).items() if mask & bit]
+
+    def record_to_dict(self, guild_id: int, record: LevelRecord) -> Dict:
+        """Render a record in the leveling_data.json format."""
+        data = {
+            'xp': record.xp,
+            'last_message': datetime.fromtimestamp(record.last_message).isoformat(),
+            'decay_steps': record.decay_steps  # always written, a missing key marks a record from before lazy decay
+        }
+        if record.achievements:
+            data['achievements'] = self.achievement_names(guild_id, record.achievements)
+        return data
+
+    def dump(self) -> Optional[dict]:
+        return {str(guild_id): self.dump_guild(guild_id) for guild_id in self.user_data}
+
+    def dump_guild(self, guild_id: int) -> Dict:
+        return {
+            str(user_id): self.record_to_dict(guild_id, record)
+            for user_id, record in self.user_data.get(guild_id, {}).items()
+        }
+
+    def guild_ids(self) -> List[int]:
+        return list(self.user_data)
+
+    def apply_decay(self, guild_id: int, user_id: int, record: LevelRecord, now: int) -> bool:
+        """Apply any decay the user has accrued since it was last computed."""
+        steps = owed_decay_steps(record.last_message, record.decay_steps, now)
+        if not steps:
+            return False
+        old_xp = record.xp
+        record.xp = decay_xp(old_xp, self.decay_rate, steps)
+        record.decay_steps += steps
+        self.leaderboard(guild_id).update(user_id, old_xp, record.xp)
+        return True
+
+    def mark_active(self, guild_id: int, user_id: int, last_message: int):
+        self.activity_days.setdefault(last_message // 86400, {}).setdefault(guild_id, set()).add(user_id)
+
+    def discard_activity(self, guild_id: int, user_id: int, last_message: int):
+        day = last_message // 86400
+        guilds = self.activity_days.get(day)
+        if guilds is None or guild_id not in guilds:
+            return
+        guilds[guild_id].discard(user_id)
+        if not guilds[guild_id]:
+            del guilds[guild_id]
+            if not guilds:
+                del self.activity_days[day]
+
+    def touch(self, guild_id: int, user_id: int, record: LevelRecord, is_new: bool = False):
+        """Stamp the user as active now."""
+        now = int(time.time())
+        if self.lazy_decay and not is_new:
+            self.discard_activity(guild_id, user_id, record.last_message)
+        record.last_message = now
+        record.decay_steps = 0
+        if self.lazy_decay:
+            self.mark_active(guild_id, user_id, now)
+
+    def get_user(self, guild_id: int, user_id: int) -> Optional[Dict]:
+        record = self.user_data.get(guild_id, {}).get(user_id)
+        if record is None:
+            return None
+        if self.lazy_decay:
+            self.apply_decay(guild_id, user_id, record, int(time.time()))
+        return self.record_to_dict(guild_id, record)
+
+    def add_xp(self, guild_id: int, user_id: int, amount: int) -> int:
+        """Add XP to a user, creating the record if needed. Returns the new total."""
+        guild_data = self.user_data.setdefault(guild_id, {})
+        record = guild_data.get(user_id)
+        is_new = record is None
+        if is_new:
+            record = guild_data[user_id] = LevelRecord()
+        elif self.lazy_decay:
+            self.apply_decay(guild_id, user_id, record, int(time.time()))
+        old_xp = None if is_new else record.xp
+        record.xp += amount
+        self.touch(guild_id, user_id, record, is_new)
+        self.leaderboard(guild_id).update(user_id, old_xp, record.xp)
+        return record.xp
+
+    def set_xp(self, guild_id: int, user_id: int, xp: int):
+        guild_data = self.user_data.setdefault(guild_id, {})
+        old_record = guild_data.get(user_id)
+        if old_record is not None and self.lazy_decay:
+            self.discard_activity(guild_id, user_id, old_record.last_message)
+        record = guild_data[user_id] = LevelRecord(xp)
+        self.touch(guild_id, user_id, record, is_new=True)
+        self.leaderboard(guild_id).update(user_id, old_record.xp if old_record else None, xp)
+
+    def reset_guild(self, guild_id: int) -> bool:
+        self.leaderboards.pop(guild_id, None)
+        self.achievement_bits.pop(guild_id, None)
+        users = self.user_data.pop(guild_id, None)
+        if users is None:
+            return False
+        if self.lazy_decay:
+            for guilds in self.activity_days.values():
+                guilds.pop(guild_id, None)
+            self.activity_days = {day: guilds for day, guilds in self.activity_days.items() if guilds}
+        return True
+
+    def top_users(self, guild_id: int, limit: int = 10, offset: int = 0) -> List[Tuple[int, int]]:
+        """Return (user_id, xp) pairs for the highest-XP users of a guild, with owed decay applied."""
+        if guild_id not in self.leaderboards:
+            return []
+        while True:
+            users = self.leaderboards[guild_id].top(limit, offset)
+            if not self.lazy_decay:
+                return users
+            # decaying a listed user can let someone else into the window, so settle until it is stable
+            now = int(time.time())
+            records = self.user_data[guild_id]
+            if not [user_id for user_id, _ in users if self.apply_decay(guild_id, user_id, records[user_id], now)]:
+                return users
+
+    def rank(self, guild_id: int, user_id: int) -> Optional[int]:
+        record = self.user_data.get(guild_id, {}).get(user_id)
+        if record is None:
+            return None
+        if self.lazy_decay:
+            self.apply_decay(guild_id, user_id, record, int(time.time()))
+        return self.leaderboard(guild_id).rank(user_id, record.xp)
+
+    def count_users(self, guild_id: int) -> int:
+        return len(self.user_data.get(guild_id, {}))
+
+    def unlock_achievements(self, guild_id: int, user_id: int, names: List[str]) -> List[str]:
+        """Set the achievement bits the user does not have yet and return those names."""
+        record = self.user_data.get(guild_id, {}).get(user_id)
+        if record is None:
+            return []
+        unlocked = []
+        for name in names:
+            bit = self.achievement_bit(guild_id, name)
+            if not record.achievements & bit:
+                record.achievements |= bit
+                unlocked.append(name)
+        return unlocked
+
+    def decay_inactive(self, cutoff: datetime, rate: float):
+        """Decay the XP of every user whose last message is older than cutoff."""
+        cutoff = cutoff.timestamp()
+        for guild_id, users in self.user_data.items():
+            for user_id, record in users.items():
+                if record.last_message < cutoff:
+                    old_xp = record.xp
+                    record.xp = max(0, int(old_xp * (1 - rate)))
+                    record.decay_steps += 1  # so switching to lazy decay does not apply this step again
+                    self.leaderboard(guild_id).update(user_id, old_xp, record.xp)
+
+    def catch_up_decay(self, now: int) -> int:
+        """Apply pending decay to users past the inactivity threshold. Returns users touched."""
+        touched = 0
+        cutoff_day = now // 86400 - DECAY_GRACE_DAYS
+        for day in [day for day in self.activity_days if day < cutoff_day]:
+            guilds = self.activity_days[day]
+            for guild_id, users in list(guilds.items()):
+                records = self.user_data[guild_id]
+                for user_id in list(users):
+                    record = records[user_id]
+                    if self.apply_decay(guild_id, user_id, record, now):
+                        touched += 1
+                    if record.xp == 0:
+                        users.discard(user_id)  # nothing left to decay
+                if not users:
+                    del guilds[guild_id]
+            if not guilds:
+                del self.activity_days[day]
+        return touched
+
+    def transaction(self):
+        return contextlib.nullcontext()
+
+    def close(self):
+        pass
+
+
+class SQLiteLevelingBackend:
+    """Stores leveling records in SQLite (WAL) with one row per guild member."""
+
+    transactional = True  # a failure inside transaction() rolls back every write in it
+
+    def __init__(self, db_file: str, decay_rate: float = 0.01, lazy_decay: bool = True):
+        self.decay_rate = decay_rate
+        self.lazy_decay = lazy_decay
+        self.conn = sqlite3.connect(db_file, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS levels (
+                guild_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                xp INTEGER NOT NULL DEFAULT 0,
+                last_message TEXT NOT NULL,
+                achievements TEXT NOT NULL DEFAULT '[]',
+                decay_steps INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (guild_id, user_id)
+            ) WITHOUT ROWID
+        ''')
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(levels)')]
+        if 'decay_steps' not in columns:
+            self.conn.execute('ALTER TABLE levels ADD COLUMN decay_steps INTEGER NOT NULL DEFAULT 0')
+            self.backfill_decay_steps()
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_levels_guild_xp ON levels (guild_id, xp DESC)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_levels_last_message ON levels (last_message)')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        self.has_returning = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+    def backfill_decay_steps(self):
+        """Record the steps the old daily loop already applied to rows that predate decay_steps."""
+        now = int(time.time())
+        rows = self.conn.execute('SELECT guild_id, user_id, last_message FROM levels').fetchall()
+        with self.transaction():
+            self.conn.executemany(
+                'UPDATE levels SET decay_steps = ? WHERE guild_id = ? AND user_id = ?',
+                [(legacy_decay_steps(to_epoch(last_message), now), guild_id, user_id)
+                 for guild_id, user_id, last_message in rows]
+            )
+
+    def is_migrated(self) -> bool:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'json_migrated'").fetchone()
+        return row is not None
+
+    def migrate(self, raw_user_data: dict) -> int:
+        """One-shot import of the user_data section of leveling_data.json."""
+        now = int(time.time())
+        rows = []
+        for guild_id, guild_data in raw_user_data.items():
+            for user_id, data in guild_data.items():
+                last_message = to_epoch(data.get('last_message', now))
+                rows.append((
+                    int(guild_id), int(user_id), data.get('xp', 0),
+                    datetime.fromtimestamp(last_message).isoformat(),
+                    json.dumps(data.get('achievements', [])),
+                    data['decay_steps'] if 'decay_steps' in data else legacy_decay_steps(last_message, now)
+                ))
+        self.conn.execute('BEGIN')
+        try:
+            self.conn.executemany('''
+                INSERT OR IGNORE INTO levels (guild_id, user_id, xp, last_message, achievements, decay_steps)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', rows)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)",
+                (datetime.now().isoformat(),)
+            )
+            self.conn.execute('COMMIT')
+        except sqlite3.Error:
+            self.conn.execute('ROLLBACK')
+            raise
+        return len(rows)
+
+    def load(self, raw_user_data: dict):
+        if raw_user_data and not self.is_migrated():
+            count = self.migrate(raw_user_data)
+            print(f"Migrated {count} leveling records from JSON to SQLite")
+
+    def dump(self) -> Optional[dict]:
+        return None
+
+    def pending_decay(self, xp: int, last_message: str, decay_steps: int, now: int) -> Optional[Tuple[int, int]]:
+        """(xp, decay_steps) after applying owed decay to a row, or None if nothing is owed."""
+        steps = owed_decay_steps(to_epoch(last_message), decay_steps, now)
+        if not steps:
+            return None
+        return decay_xp(xp, self.decay_rate, steps), decay_steps + steps
+
+    def get_user(self, guild_id: int, user_id: int) -> Optional[Dict]:
+        row = self.conn.execute(
+            'SELECT xp, last_message, achievements, decay_steps FROM levels WHERE guild_id = ? AND user_id = ?',
+            (guild_id, user_id)
+        ).fetchone()
+        if row is None:
+            return None
+        xp, last_message, achievements, decay_steps = row
+        if self.lazy_decay:
+            decayed = self.pending_decay(xp, last_message, decay_steps, int(time.time()))
+            if decayed:
+                xp, decay_steps = decayed
+                self.conn.execute(
+                    'UPDATE levels SET xp = ?, decay_steps = ? WHERE guild_id = ? AND user_id = ?',
+                    (xp, decay_steps, guild_id, user_id)
+                )
+        return {'xp': xp, 'last_message': last_message, 'achievements': json.loads(achievements)}
+
+    def add_xp(self, guild_id: int, user_id: int, amount: int) -> int:
+        """Upsert the user's row and return the new XP total."""
+        if self.lazy_decay:
+            self.get_user(guild_id, user_id)  # settle pending decay before adding
+        upsert = '''
+            INSERT INTO levels (guild_id, user_id, xp, last_message) VALUES (?, ?, ?, ?)
+            ON CONFLICT (guild_id, user_id)
+            DO UPDATE SET xp = xp + excluded.xp, last_message = excluded.last_message, decay_steps = 0
+        '''
+        params = (guild_id, user_id, amount, datetime.now().isoformat())
+        if self.has_returning:
+            return self.conn.execute(upsert + ' RETURNING xp', params).fetchone()[0]
+        self.conn.execute(upsert, params)
+        return self.get_user(guild_id, user_id)['xp']
+
+    def set_xp(self, guild_id: int, user_id: int, xp: int):
+        self.conn.execute('''
+            INSERT INTO levels (guild_id, user_id, xp, last_message) VALUES (?, ?, ?, ?)
+            ON CONFLICT (guild_id, user_id)
+            DO UPDATE SET xp = excluded.xp, last_message = excluded.last_message, decay_steps = 0
+        ''', (guild_id, user_id, xp, datetime.now().isoformat()))
+
+    def reset_guild(self, guild_id: int) -> bool:
+        return self.conn.execute('DELETE FROM levels WHERE guild_id = ?', (guild_id,)).rowcount > 0
+
+    def top_users(self, guild_id: int, limit: int = 10, offset: int = 0) -> List[Tuple[int, int]]:
+        """Return (user_id, xp) pairs for the highest-XP users of a guild, with owed decay applied."""
+        while True:
+            rows = self.conn.execute(
+                'SELECT user_id, xp, last_message, decay_steps FROM levels WHERE guild_id = ? '
+                'ORDER BY xp DESC, user_id LIMIT ? OFFSET ?',
+                (guild_id, limit, offset)
+            ).fetchall()
+            updates = []
+            if self.lazy_decay:
+                now = int(time.time())
+                for user_id, xp, last_message, decay_steps in rows:
+                    decayed = self.pending_decay(xp, last_message, decay_steps, now)
+                    if decayed:
+                        updates.append((*decayed, guild_id, user_id))
+            if not updates:
+                return [(user_id, xp) for user_id, xp, _, _ in rows]
+            # decaying a listed user can let someone else into the window, so settle until it is stable
+            with self.transaction():
+                self.conn.executemany(
+                    'UPDATE levels SET xp = ?, decay_steps = ? WHERE guild_id = ? AND user_id = ?',
+                    updates
+                )
+
+    def rank(self, guild_id: int, user_id: int) -> Optional[int]:
+        """Count the users ahead of this one using the (guild_id, xp) index."""
+        data = self.get_user(guild_id, user_id)
+        if data is None:
+            return None
+        return self.conn.execute(
+            'SELECT COUNT(*) + 1 FROM levels WHERE guild_id = ? AND (xp > ? OR (xp = ? AND user_id < ?))',
+            (guild_id, data['xp'], data['xp'], user_id)
+        ).fetchone()[0]
+
+    def count_users(self, guild_id: int) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM levels WHERE guild_id = ?', (guild_id,)).fetchone()[0]
+
+    def unlock_achievements(self, guild_id: int, user_id: int, names: List[str]) -> List[str]:
+        """Append the achievements the user does not have yet and return those names."""
+        row = self.conn.execute(
+            'SELECT achievements FROM levels WHERE guild_id = ? AND user_id = ?',
+            (guild_id, user_id)
+        ).fetchone()
+        if row is None:
+            return []
+        current = json.loads(row[0])
+        owned = set(current)
+        unlocked = [name for name in names if name not in owned]
+        if unlocked:
+            self.conn.execute(
+                'UPDATE levels SET achievements = ? WHERE guild_id = ? AND user_id = ?',
+                (json.dumps(current + unlocked), guild_id, user_id)
+            )
+        return unlocked
+
+    def decay_inactive(self, cutoff: datetime, rate: float):
+        self.conn.execute(
+            'UPDATE levels SET xp = MAX(0, CAST(xp * ? AS INTEGER)), decay_steps = decay_steps + 1 WHERE last_message < ?',
+            (1 - rate, cutoff.isoformat())
+        )
+
+    def catch_up_decay(self, now: int) -> int:
+        """Apply pending decay to rows past the inactivity threshold, found via the last_message index."""
+        cutoff = datetime.fromtimestamp(now - (DECAY_GRACE_DAYS + 1) * 86400).isoformat()
+        updates = []
+        for guild_id, user_id, xp, last_message, decay_steps in self.conn.execute(
+            'SELECT guild_id, user_id, xp, last_message, decay_steps FROM levels WHERE last_message < ? AND xp > 0',
+            (cutoff,)
+        ).fetchall():
+            decayed = self.pending_decay(xp, last_message, decay_steps, now)
+            if decayed:
+                updates.append((*decayed, guild_id, user_id))
+        if updates:
+            with self.transaction():
+                self.conn.executemany(
+                    'UPDATE levels SET xp = ?, decay_steps = ? WHERE guild_id = ? AND user_id = ?',
+                    updates
+                )
+        return len(updates)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Group many writes into one commit instead of one WAL commit per statement."""
+        self.conn.execute('BEGIN')
+        try:
+            yield
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+
+    def close(self):
+        self.conn.close()
+
+
 class LevelingSystem(commands.Cog):                         # FULLY FIXED
     def __init__(self, bot):
         self.bot = bot
         self.owner_id = int(os.getenv('BOT_OWNER_ID'))
-        self.user_data: Dict[int, Dict[int, Dict]] = {}  # {guild_id: {user_id: data}}
+        self.xp_decay_rate = 0.01
+        self.decay_mode = os.getenv('LEVELING_DECAY_MODE', 'lazy').lower()  # "lazy" or "daily"
+        self.decay_catch_up = True  # lazy mode: daily pass over users past the inactivity threshold
+        self.storage_mode = os.getenv('LEVELING_STORAGE', 'json').lower()  # "json" or "sqlite"
+        lazy_decay = self.decay_mode == 'lazy'
+        if self.storage_mode == 'sqlite':
+            self.backend = SQLiteLevelingBackend("leveling_data.db", self.xp_decay_rate, lazy_decay)
+        else:
+            self.backend = JSONLevelingBackend(self.xp_decay_rate, lazy_decay)
         self.roles: Dict[int, Dict[int, int]] = {}       # {guild_id: {level: role_id}}
+        self.level_roles: Dict[int, Dict[int, int]] = {}  # int-keyed copy of roles used at level-up
+        self.level_up_queues: Dict[int, Dict[int, Tuple[int, int]]] = {}  # {guild_id: {user_id: (from_level, to_level)}}
+        self.level_up_workers: Dict[int, asyncio.Task] = {}
+        self.level_up_spacing = 0.5                      # seconds between level-ups in one guild
         self.achievements: Dict[int, Dict[str, Dict]] = {}  # {guild_id: {name: data}}
-        self.xp_decay_rate = 0.01
+        self.achievement_index: Dict[int, Tuple[List[int], List[Tuple[str, Dict]]]] = {}  # {guild_id: (levels, entries)}
         self.xp_gain_range = (15, 25)
+        self.xp_cooldown = float(os.getenv('LEVELING_XP_COOLDOWN', 60))  # seconds between XP grants per user
+        self.xp_drain_interval = 5                       # seconds between accumulator drains
         self.xp_multipliers: Dict[int, Dict[int, float]] = {}  # {guild_id: {role_id: multiplier}}
+        self.multiplier_index: Dict[int, Dict[int, float]] = {}  # {guild_id: {user_or_role_id: multiplier}}
+        self.multiplier_roles: Dict[int, Tuple[int, ...]] = {}   # {guild_id: the multiplier targets that are roles}
+        self.last_xp_grant: Dict[Tuple[int, int], float] = {}  # {(guild_id, user_id): monotonic time}
+        self.pending_xp: Dict[Tuple[int, int], int] = {}       # {(guild_id, user_id): xp not yet stored}
         self.data_file = "leveling_data.json"
         self.leaderboard_channels: Dict[int, int] = {}    # {guild_id: channel_id}
+        self.leaderboard_messages: Dict[int, int] = {}    # {guild_id: message_id}
+        self.leaderboard_hashes: Dict[int, int] = {}      # {guild_id: hash of the last posted top 10}
+        self.leaderboard_interval = 1800                  # seconds per full pass over all guilds
         self.announcement_channels: Dict[int, int] = {}   # {guild_id: channel_id}
+        self.user_data_fragments: Dict[int, str] = {}  # {guild_id: encoded user data} reused while the guild is clean
+        self.store = WriteBehindStore(self.data_file, self.snapshot_data, encode=self.encode_data)
         self.load_data()
-        self.bot.loop.create_task(self.update_leaderboard_task())
-        self.bot.loop.create_task(self.xp_decay_task())
+        self.store.start(self.bot.loop)
+        self.tasks = [
+            self.bot.loop.create_task(self.update_leaderboard_task()),
+            self.bot.loop.create_task(self.xp_decay_task()),
+            self.bot.loop.create_task(self.drain_xp_task())
+        ]
+
+    async def cog_unload(self):
+        """Stop background tasks and flush pending leveling data on shutdown."""
+        for task in self.tasks + list(self.level_up_workers.values()):
+            task.cancel()
+        await self.drain_pending_xp()
+        await self.store.close()
+        self.backend.close()
 
     def load_data(self):
         """Load user data, roles, and achievements from a JSON file."""
@@ -1159,37 +1885,124 @@ class LevelingSystem(commands.Cog):                         # FULLY FIXED
             with open(self.data_file, 'r') as f:
                 data = json.load(f)
                 
-                self.user_data = {
-                    int(guild_id): {
-                        int(user_id): user_data 
-                        for user_id, user_data in guild_data.items()
-                    } for guild_id, guild_data in data.get('user_data', {}).items()
+                if self.storage_mode == 'sqlite' and data.get('user_data') and not self.backend.is_migrated():
+                    shutil.copyfile(self.data_file, f"{self.data_file}.bak")  # keep the pre-migration JSON
+                self.backend.load(data.get('user_data', {}))
+                # JSON object keys come back as strings; commands write ints, so normalize or guilds appear twice
+                self.roles = {
+                    int(guild_id): self.level_role_map(level_roles)
+                    for guild_id, level_roles in data.get('roles', {}).items()
                 }
-                self.roles = data.get('roles', {})
-                self.achievements = data.get('achievements', {})
-                self.xp_multipliers = data.get('xp_multipliers', {})
-                self.leaderboard_channels = data.get('leaderboard_channels', {})
-                self.announcement_channels = data.get('announcement_channels', {})
-
-    def save_data(self):
-            """Save user data, roles, and achievements to a JSON file."""
-            
-            cleaned_user_data = {}
-            for guild_id, guild_data in self.user_data.items():
-                cleaned_user_data[str(guild_id)] = {
-                    str(user_id): user_data
-                    for user_id, user_data in guild_data.items()
+                self.achievements = {
+                    int(guild_id): achievements
+                    for guild_id, achievements in data.get('achievements', {}).items()
+                }
+                self.xp_multipliers = {
+                    int(guild_id): multipliers
+                    for guild_id, multipliers in data.get('xp_multipliers', {}).items()
+                }
+                self.leaderboard_channels = {
+                    int(guild_id): channel_id
+                    for guild_id, channel_id in data.get('leaderboard_channels', {}).items()
+                }
+                self.leaderboard_messages = {
+                    int(guild_id): message_id
+                    for guild_id, message_id in data.get('leaderboard_messages', {}).items()
                 }
+                self.announcement_channels = {
+                    int(guild_id): channel_id
+                    for guild_id, channel_id in data.get('announcement_channels', {}).items()
+                }
+        self.rebuild_multiplier_index()
+        self.rebuild_level_role_index()
+        self.rebuild_achievement_index()
+
+    def rebuild_achievement_index(self):
+        """Sort each guild's achievements by required_level so level-ups can bisect to the crossed ones."""
+        self.achievement_index = {}
+        for guild_id, achievements in self.achievements.items():
+            if not isinstance(achievements, dict) or not achievements:
+                continue
+            entries = sorted(
+                ((int(data['required_level']), name, data) for name, data in achievements.items()),
+                key=lambda entry: entry[0]
+            )
+            self.achievement_index[int(guild_id)] = (
+                [level for level, _, _ in entries],
+                [(name, data) for _, name, data in entries]
+            )
+
+    @staticmethod
+    def level_role_map(level_roles) -> Dict[int, int]:
+        """{level: role_id} with int levels, from saved or imported JSON."""
+        if not isinstance(level_roles, dict):
+            return {}
+        return {int(level): role_id for level, role_id in level_roles.items()}
+
+    def rebuild_level_role_index(self):
+        """Normalize roles into {guild_id: {level: role_id}} with int keys."""
+        self.level_roles = {
+            int(guild_id): {int(level): int(role_id) for level, role_id in level_roles.items()}
+            for guild_id, level_roles in self.roles.items()
+            if isinstance(level_roles, dict) and level_roles
+        }
+
+    def rebuild_multiplier_index(self):
+        """Normalize xp_multipliers into int-keyed lookups used on the message path."""
+        self.multiplier_index = {}
+        for guild_id, multipliers in self.xp_multipliers.items():
+            index = {
+                int(target_id): float(multiplier)
+                for target_id, multiplier in multipliers.items()
+                if isinstance(multiplier, (int, float))
+            }
+            if index:
+                self.multiplier_index[int(guild_id)] = index
+        self.multiplier_roles = {}  # resolved again on the next message in each guild
+
+    def save_data(self, guild_id: int = None, user_id: int = None):
+        """Mark data as changed; the write-behind store persists it in the background."""
+        if user_id is not None and self.storage_mode == 'sqlite':
+            return  # the database already has it and leveling_data.json holds no user data
+        self.store.mark_dirty((guild_id, user_id))
+
+    def snapshot_data(self) -> dict:
+        """Copy of the settings part of leveling_data.json (roles, achievements, channels)."""
+        return copy.deepcopy({
+            'roles': self.roles,
+            'achievements': self.achievements,
+            'xp_multipliers': self.xp_multipliers,
+            'leaderboard_channels': self.leaderboard_channels,
+            'leaderboard_messages': self.leaderboard_messages,
+            'announcement_channels': self.announcement_channels
+        })
+
+    async def encode_data(self, dirty: set) -> bytes:
+        """Encode leveling_data.json in a worker thread, re-encoding user data only for guilds marked dirty."""
+        settings = self.snapshot_data()
+        if self.storage_mode == 'sqlite':  # user data lives in the database
+            return await asyncio.to_thread(WriteBehindStore.encode_json, settings)
+
+        changed = {key[0] if isinstance(key, tuple) else None for key in dirty}
+        if None in changed:  # saved without a guild, e.g. after the decay pass
+            self.user_data_fragments = {}
+        guild_ids = self.backend.guild_ids()
+        stale = {
+            guild_id: self.backend.dump_guild(guild_id) for guild_id in guild_ids
+            if guild_id in changed or guild_id not in self.user_data_fragments
+        }
 
-            with open(self.data_file, 'w') as f:
-                json.dump({
-                    'user_data': cleaned_user_data,
-                    'roles': self.roles,
-                    'achievements': self.achievements,
-                    'xp_multipliers': self.xp_multipliers,
-                    'leaderboard_channels': self.leaderboard_channels,
-                    'announcement_channels': self.announcement_channels
-                }, f, indent=4)
+        def encode():
+            fragments = {guild_id: json.dumps(data) for guild_id, data in stale.items()}
+            for guild_id in guild_ids:
+                if guild_id not in fragments:
+                    fragments[guild_id] = cached[guild_id]
+            body = ", ".join(f'"{guild_id}": {fragments[guild_id]}' for guild_id in guild_ids)
+            return fragments, f'{json.dumps(settings)[:-1]}, "user_data": {{{body}}}}}'.encode()
+
+        cached = dict(self.user_data_fragments)
+        self.user_data_fragments, payload = await asyncio.to_thread(encode)
+        return payload
 
     def calculate_level(self, xp: int) -> int:
         """Calculate the user's level based on their XP."""
@@ -1199,67 +2012,128 @@ class LevelingSystem(commands.Cog):                         # FULLY FIXED
         """Calculate the XP required for the next level."""
         return (level + 1) ** 2 * 100
 
-    async def add_xp(self, user_id: int, guild_id: int):
-        """Add XP to a user and handle level-ups."""
-        
+    def roll_xp(self, member: discord.Member) -> int:
+        """Roll the XP for one message, applying user and role multipliers."""
         xp_gain = random.randint(*self.xp_gain_range)
-        
-        multiplier = float(self.xp_multipliers.get(guild_id, {}).get(str(user_id), 1.0))
-        if isinstance(multiplier, dict):
-            multiplier = 1.0
-        xp_gain = int(xp_gain * multiplier)
 
-        if guild_id not in self.user_data:
-            self.user_data[guild_id] = {}
-        if user_id not in self.user_data[guild_id]:
-            self.user_data[guild_id][user_id] = {'xp': 0, 'last_message': datetime.now().isoformat()}
+        guild = member.guild
+        multipliers = self.multiplier_index.get(guild.id)
+        if multipliers:
+            xp_gain = int(xp_gain * multipliers.get(member.id, 1.0))
+            role_ids = self.multiplier_roles.get(guild.id)
+            if role_ids is None:
+                # user and role multipliers share one dict, so split out the roles once per guild
+                role_ids = self.multiplier_roles[guild.id] = tuple(
+                    target_id for target_id in multipliers if guild.get_role(target_id)
+                )
+            for role_id in role_ids:
+                if member.get_role(role_id):
+                    xp_gain = int(xp_gain * multipliers[role_id])
+        return xp_gain
+
+    def grant_xp(self, member: discord.Member) -> bool:
+        """Queue XP for a message unless the member is still on cooldown."""
+        key = (member.guild.id, member.id)
+        now = time.monotonic()
+        if now - self.last_xp_grant.get(key, -self.xp_cooldown) < self.xp_cooldown:
+            return False
+        self.last_xp_grant[key] = now
+        self.pending_xp[key] = self.pending_xp.get(key, 0) + self.roll_xp(member)
+        return True
 
-        user_data = self.user_data[guild_id][user_id]
+    async def drain_xp_task(self):
+        """Task to move accumulated XP into storage in batches."""
+        await self.bot.wait_until_ready()
+        while not self.bot.is_closed():
+            await asyncio.sleep(self.xp_drain_interval)
+            await self.drain_pending_xp()
 
-        guild = self.bot.get_guild(guild_id)
-        member = guild.get_member(user_id)
-        if member:
-            for role_id, role_multiplier in self.xp_multipliers.get(guild_id, {}).items():
-                if isinstance(role_multiplier, (int, float)) and role_id in [role.id for role in member.roles]:
-                    xp_gain = int(xp_gain * float(role_multiplier))
+    async def drain_pending_xp(self):
+        """Store all accumulated XP, then handle level-ups and drop cooldown entries that have expired."""
+        pending, self.pending_xp = self.pending_xp, {}
+        stored = []
+        try:
+            with self.backend.transaction():  # nothing in here may await, other coroutines share the connection
+                for (guild_id, user_id), xp_gain in pending.items():
+                    stored.append((user_id, guild_id, xp_gain, self.backend.add_xp(guild_id, user_id, xp_gain)))
+        except Exception as e:
+            print(f"Failed to store pending XP: {e}")
+            if self.backend.transactional:
+                stored = []
+            saved = {(guild_id, user_id) for user_id, guild_id, _, _ in stored}
+            for key, xp_gain in pending.items():
+                if key not in saved:  # retried on the next drain
+                    self.pending_xp[key] = self.pending_xp.get(key, 0) + xp_gain
 
-        user_data['xp'] += xp_gain
-        user_data['last_message'] = datetime.now().isoformat()
+        for user_id, guild_id, xp_gain, new_xp in stored:
+            self.handle_xp_gain(user_id, guild_id, xp_gain, new_xp)
 
-        old_level = self.calculate_level(user_data['xp'] - xp_gain)
-        new_level = self.calculate_level(user_data['xp'])
+        expired = time.monotonic() - self.xp_cooldown
+        self.last_xp_grant = {key: t for key, t in self.last_xp_grant.items() if t > expired}
 
-        if new_level > old_level:
-            await self.handle_level_up(user_id, guild_id, new_level)
+    def handle_xp_gain(self, user_id: int, guild_id: int, xp_gain: int, new_xp: int):
+        """Handle level-ups for XP the backend has already stored."""
+        old_level = self.calculate_level(new_xp - xp_gain)
+        new_level = self.calculate_level(new_xp)
 
-        self.save_data()
+        if new_level > old_level:
+            self.queue_level_up(user_id, guild_id, old_level, new_level)
+
+        self.save_data(guild_id, user_id)
+
+    def queue_level_up(self, user_id: int, guild_id: int, old_level: int, new_level: int):
+        """Queue a level-up; each guild processes its queue one member at a time."""
+        queue = self.level_up_queues.setdefault(guild_id, {})
+        if user_id in queue:
+            queued_from, queued_to = queue[user_id]
+            old_level, new_level = min(old_level, queued_from), max(new_level, queued_to)
+        queue[user_id] = (old_level, new_level)
+        worker = self.level_up_workers.get(guild_id)
+        if worker is None or worker.done():
+            self.level_up_workers[guild_id] = self.bot.loop.create_task(self.process_level_ups(guild_id))
+
+    async def process_level_ups(self, guild_id: int):
+        """Work through a guild's queued level-ups, spaced out to respect role-edit rate limits."""
+        queue = self.level_up_queues.get(guild_id)
+        unlocks = []
+        while queue:
+            user_id = next(iter(queue))
+            previous_level, level = queue.pop(user_id)
+            try:
+                unlocks.extend(await self.handle_level_up(user_id, guild_id, level, previous_level))
+            except Exception as e:
+                print(f"Failed to handle level-up for {user_id} in guild {guild_id}: {e}")
+            await asyncio.sleep(self.level_up_spacing)
+        self.level_up_queues.pop(guild_id, None)
+        self.level_up_workers.pop(guild_id, None)
+        if unlocks:
+            await self.announce_achievements(guild_id, unlocks)
 
 
-    async def handle_level_up(self, user_id: int, guild_id: int, level: int):
+    async def handle_level_up(self, user_id: int, guild_id: int, level: int, previous_level: int = 0):
         """
         Handle level-up announcements, role assignments, and achievements.
         - Sends an announcement to the specified channel.
-        - Assigns the role for the new level (if set).
-        - Removes the role for the previous level (if applicable).
-        - Checks for achievements.
+        - Gives the role for the highest reached level and removes other level roles in one request.
+        - Unlocks achievements crossed since previous_level and returns them for announcement.
         """
         if guild_id not in self.announcement_channels:
-            return
+            return []
 
         guild = self.bot.get_guild(guild_id)
         if not guild:
             print(f"Guild {guild_id} not found")
-            return
+            return []
 
         member = guild.get_member(user_id)
         if not member:
             print(f"Member {user_id} not found in guild {guild_id}")
-            return
+            return []
 
         channel = self.bot.get_channel(self.announcement_channels.get(guild_id))
         if not channel:
             print("Announcement channel not found")
-            return
+            return []
 
         embed = discord.Embed(
             title="🌟 Level Up! 🌟",
@@ -1277,58 +2151,108 @@ class LevelingSystem(commands.Cog):                         # FULLY FIXED
         except discord.HTTPException as e:
             print(f"Failed to send level-up announcement: {e}")
 
-        if guild_id in self.roles and level in self.roles[guild_id]:
-            role = discord.utils.get(guild.roles, id=self.roles[guild_id][level])
-            if role:
-                try:
-                    for lvl, role_id in self.roles[guild_id].items():
-                        if lvl != level and role_id in [r.id for r in member.roles]:
-                            previous_role = discord.utils.get(guild.roles, id=role_id)
-                            if previous_role:
-                                await member.remove_roles(previous_role)
-                                print(f"Removed previous level role: {previous_role.name}")
+        await self.sync_level_roles(member, level)
+        return self.check_achievements(member, level, previous_level)
 
-                    await member.add_roles(role)
-                    print(f"Assigned role {role.name} to {member.display_name}")
-                except discord.Forbidden:
-                    print(f"Bot does not have permission to manage roles for {member.display_name}")
-                except discord.HTTPException as e:
-                    print(f"Failed to assign role: {e}")
-            else:
+    async def sync_level_roles(self, member: discord.Member, level: int):
+        """Reconcile the member's level roles with a single member.edit call."""
+        level_roles = self.level_roles.get(member.guild.id)
+        if not level_roles:
+            return
+
+        reached = [lvl for lvl in level_roles if lvl <= level]
+        target_id = level_roles[max(reached)] if reached else None
+        level_role_ids = set(level_roles.values())
+
+        current = member.roles[1:]  # skip @everyone
+        desired = [r for r in current if r.id not in level_role_ids or r.id == target_id]
+        if target_id and not member.get_role(target_id):
+            role = member.guild.get_role(target_id)
+            if role is None:
                 print(f"Role for level {level} not found")
-        else:
-            print(f"No role assigned for level {level}")
+            else:
+                desired.append(role)
+
+        if len(desired) == len(current) and all(member.get_role(r.id) for r in desired):
+            return
 
-        await self.check_achievements(user_id, guild_id, level)
+        try:
+            await member.edit(roles=desired, reason=f"Reached level {level}")
+            print(f"Updated level roles for {member.display_name} (level {level})")
+        except discord.Forbidden:
+            print(f"Bot does not have permission to manage roles for {member.display_name}")
+        except discord.HTTPException as e:
+            print(f"Failed to assign role: {e}")
 
-    async def check_achievements(self, user_id: int, guild_id: int, level: int):
-        """Check if the user has unlocked any achievements."""
+    def check_achievements(self, member: discord.Member, level: int, previous_level: int = 0) -> List[Tuple[discord.Member, str, Dict]]:
+        """Unlock the achievements whose required_level lies in (previous_level, level]."""
+        guild_id = member.guild.id
+        index = self.achievement_index.get(guild_id)
+        if not index:
+            return []
+
+        levels, entries = index
+        crossed = entries[bisect.bisect_right(levels, previous_level):bisect.bisect_right(levels, level)]
+        if not crossed:
+            return []
+
+        unlocked = set(self.backend.unlock_achievements(guild_id, member.id, [name for name, _ in crossed]))
+        if unlocked:
+            self.save_data(guild_id, member.id)
+        return [(member, name, data) for name, data in crossed if name in unlocked]
+
+    async def announce_achievements(self, guild_id: int, unlocks: List[Tuple[discord.Member, str, Dict]]):
+        """Announce a burst of achievement unlocks in one embed."""
         guild = self.bot.get_guild(guild_id)
-        member = guild.get_member(user_id)
-        if not member:
+        if not guild:
+            return
+        channel = guild.system_channel or self.bot.get_channel(self.announcement_channels.get(guild_id))
+        if not channel:
+            print(f"No channel to announce achievements in guild {guild_id}")
             return
 
-        for achievement, data in self.achievements.items():
-            if level >= data['required_level'] and achievement not in self.user_data[guild_id][user_id].get('achievements', []):
-                self.user_data[guild_id][user_id].setdefault('achievements', []).append(achievement)
-                embed = discord.Embed(
-                    title="🏆 Achievement Unlocked! 🏆",
-                    description=f"🎉 {member.mention} has unlocked the **{achievement}** achievement! 🎉",
-                    color=discord.Color.blue()
-                )
-                embed.add_field(name="Reward", value=data['reward'], inline=False)
-                await guild.system_channel.send(embed=embed)
+        lines = [
+            f"🎉 {member.mention} unlocked **{name}** (Reward: {data.get('reward', 'None')})"
+            for member, name, data in unlocks
+        ]
+        description = ""
+        for i, line in enumerate(lines):
+            if len(description) + len(line) > 3900:
+                description += f"...and {len(lines) - i} more"
+                break
+            description += line + "\n"
+
+        embed = discord.Embed(
+            title="🏆 Achievement Unlocked! 🏆" if len(unlocks) == 1 else "🏆 Achievements Unlocked! 🏆",
+            description=description,
+            color=discord.Color.blue()
+        )
+        try:
+            await channel.send(embed=embed)
+        except discord.Forbidden:
+            print(f"Bot does not have permission to send messages in {channel.name}")
+        except discord.HTTPException as e:
+            print(f"Failed to send achievement announcement: {e}")
 
     async def update_leaderboard_task(self):
-        """Task to update the leaderboard periodically."""
+        """Task to update the leaderboards periodically, spread across the interval with jitter."""
         await self.bot.wait_until_ready()
         while not self.bot.is_closed():
-            if self.leaderboard_channels:
-                for guild_id, channel_id in self.leaderboard_channels.items():
-                    channel = self.bot.get_channel(channel_id)
-                    if channel:
+            targets = list(self.leaderboard_channels.items())
+            if not targets:
+                await asyncio.sleep(self.leaderboard_interval)
+                continue
+
+            spacing = self.leaderboard_interval / len(targets)
+            random.shuffle(targets)
+            for guild_id, channel_id in targets:
+                channel = self.bot.get_channel(channel_id)
+                if channel:
+                    try:
                         await self.update_leaderboard(channel)
-            await asyncio.sleep(1800)
+                    except discord.HTTPException as e:
+                        print(f"Failed to update leaderboard in guild {guild_id}: {e}")
+                await asyncio.sleep(spacing * random.uniform(0.5, 1.5))
 
 
     async def update_leaderboard(self, channel: discord.TextChannel):
@@ -1337,61 +2261,66 @@ class LevelingSystem(commands.Cog):                         # FULLY FIXED
         if guild_id not in self.leaderboard_channels:
             return
             
-        if guild_id not in self.user_data or not self.user_data[guild_id]:
+        sorted_users = self.backend.top_users(guild_id, 10)
+        if not sorted_users:
             return
 
-        sorted_users = sorted(
-            self.user_data[guild_id].items(),
-            key=lambda x: x[1]['xp'],
-            reverse=True
-        )[:10]
-
         embed = discord.Embed(
             title="🏆 Live Leaderboard 🏆",
             description="Top 10 users by XP",
             color=discord.Color.green()
         )
 
-        for i, (user_id, data) in enumerate(sorted_users, 1):
+        fields = []
+        for i, (user_id, xp) in enumerate(sorted_users, 1):
             member = channel.guild.get_member(user_id)
             if member:
-                embed.add_field(
-                    name=f"{i}. {member.display_name}",
-                    value=f"Level {self.calculate_level(data['xp'])} | {data['xp']} XP",
-                    inline=False
-                )
+                fields.append((f"{i}. {member.display_name}", f"Level {self.calculate_level(xp)} | {xp} XP"))
+                embed.add_field(name=fields[-1][0], value=fields[-1][1], inline=False)
 
-        async for message in channel.history(limit=10):
-            if message.author == self.bot.user and "🏆 Live Leaderboard 🏆" in message.embeds[0].title:
-                await message.delete()
-                break
+        content_hash = hash((channel.id, tuple(fields)))
+        message_id = self.leaderboard_messages.get(guild_id)
+        if message_id and self.leaderboard_hashes.get(guild_id) == content_hash:
+            return
 
-        await channel.send(embed=embed)
+        if message_id:
+            try:
+                await channel.get_partial_message(message_id).edit(embed=embed)
+                self.leaderboard_hashes[guild_id] = content_hash
+                return
+            except discord.NotFound:
+                pass  # message or channel was deleted, post a new one
+
+        message = await channel.send(embed=embed)
+        self.leaderboard_messages[guild_id] = message.id
+        self.leaderboard_hashes[guild_id] = content_hash
+        self.save_data(guild_id)
 
     async def xp_decay_task(self):
         """Task to decay XP over time."""
         await self.bot.wait_until_ready()
         while not self.bot.is_closed():
-            for guild_id, users in self.user_data.items():
-                for user_id, data in users.items():
-                    last_message = datetime.fromisoformat(data['last_message'])
-                    if (datetime.now() - last_message).days > 7:  
-                        data['xp'] = max(0, int(data['xp'] * (1 - self.xp_decay_rate)))
-            self.save_data()
+            if self.decay_mode == 'lazy':
+                if self.decay_catch_up and self.backend.catch_up_decay(int(time.time())):
+                    self.save_data()
+            else:
+                self.backend.decay_inactive(datetime.now() - timedelta(days=DECAY_GRACE_DAYS + 1), self.xp_decay_rate)
+                self.save_data()
             await asyncio.sleep(86400)  
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         """Track user messages and add XP."""
-        if message.author.bot:
+        if message.author.bot or not message.guild:
             return
-        await self.add_xp(message.author.id, message.guild.id)
+        self.grant_xp(message.author)
 
     @commands.command()
     @commands.has_permissions(administrator=True)
     async def set_level_role(self, ctx, level: int, role: discord.Role):
         """Set a role for a specific level."""
-        self.roles[level] = role.id
+        self.roles.setdefault(ctx.guild.id, {})[level] = role.id
+        self.rebuild_level_role_index()
         self.save_data()
         await ctx.send(f"✅ Role {role.name} will be assigned at level {level}.")
 
@@ -1400,6 +2329,8 @@ class LevelingSystem(commands.Cog):                         # FULLY FIXED
     async def set_leaderboard_channel(self, ctx, channel: discord.TextChannel):
         """Set the channel for the live-updating leaderboard."""
         self.leaderboard_channels[ctx.guild.id] = channel.id
+        self.leaderboard_messages.pop(ctx.guild.id, None)
+        self.leaderboard_hashes.pop(ctx.guild.id, None)
         self.save_data()
         await ctx.send(f"✅ Leaderboard will be updated in {channel.mention}.")
         await self.update_leaderboard(channel)
@@ -1407,19 +2338,62 @@ class LevelingSystem(commands.Cog):                         # FULLY FIXED
 
     @commands.command()
     @commands.has_permissions(administrator=True)
-    async def leaderboard(self, ctx):
-        """Display the server's leveling leaderboard."""
-        await self.update_leaderboard(ctx.channel)
+    async def leaderboard(self, ctx, page: int = 1):
+        """Display the server's leveling leaderboard, 10 users per page."""
+        guild_id = ctx.guild.id
+        total_users = self.backend.count_users(guild_id)
+        if not total_users:
+            return await ctx.send("No leveling data found for this server.")
+
+        pages = (total_users + 9) // 10
+        page = max(1, min(page, pages))
+        offset = (page - 1) * 10
+
+        embed = discord.Embed(
+            title="🏆 Leaderboard 🏆",
+            color=discord.Color.green()
+        )
+        lines = []
+        for i, (user_id, xp) in enumerate(self.backend.top_users(guild_id, 10, offset), offset + 1):
+            member = ctx.guild.get_member(user_id)
+            name = member.display_name if member else f"User {user_id}"
+            lines.append(f"**{i}.** {name} | Level {self.calculate_level(xp)} | {xp} XP")
+        embed.description = "\n".join(lines)
+        embed.set_footer(text=f"Page {page}/{pages} | {total_users} users")
+        await ctx.send(embed=embed)
+
+    @commands.command()
+    async def rank(self, ctx, member: discord.Member = None):
+        """Show your rank (or another member's) and the users around it."""
+        member = member or ctx.author
+        guild_id = ctx.guild.id
+        position = self.backend.rank(guild_id, member.id)
+        if position is None:
+            return await ctx.send(f"{member.display_name} hasn't earned any XP yet!")
+
+        nearby = self.backend.top_users(guild_id, 5, max(0, position - 3))
+        lines = []
+        for i, (user_id, xp) in enumerate(nearby, max(1, position - 2)):
+            user = ctx.guild.get_member(user_id)
+            name = user.display_name if user else f"User {user_id}"
+            marker = "➡️ " if user_id == member.id else ""
+            lines.append(f"{marker}**{i}.** {name} | {xp} XP")
+
+        embed = discord.Embed(
+            title=f"📈 {member.display_name}'s Rank",
+            description=f"Rank **#{position}** of {self.backend.count_users(guild_id)}",
+            color=discord.Color.green()
+        )
+        embed.add_field(name="Nearby", value="\n".join(lines), inline=False)
+        await ctx.send(embed=embed)
 
     @commands.command()
     @commands.is_owner()
     async def set_xp(self, ctx, user: discord.Member, xp: int):
         """Bot owner command: Set a user's XP."""
         guild_id = ctx.guild.id
-        if guild_id not in self.user_data:
-            self.user_data[guild_id] = {}
-        self.user_data[guild_id][user.id] = {'xp': xp, 'last_message': datetime.now().isoformat()}
-        self.save_data()
+        self.backend.set_xp(guild_id, user.id, xp)
+        self.save_data(guild_id, user.id)
         await ctx.send(f"✅ Set {user.mention}'s XP to {xp}.")
 
     @commands.command()
@@ -1427,9 +2401,8 @@ class LevelingSystem(commands.Cog):                         # FULLY FIXED
     async def reset_levels(self, ctx):
         """Bot owner command: Reset all leveling data for the server."""
         guild_id = ctx.guild.id
-        if guild_id in self.user_data:
-            del self.user_data[guild_id]
-            self.save_data()
+        if self.backend.reset_guild(guild_id):
+            self.save_data(guild_id)
             await ctx.send("✅ Reset all leveling data for this server.")
         else:
             await ctx.send("No leveling data found for this server.")
@@ -1439,8 +2412,9 @@ class LevelingSystem(commands.Cog):                         # FULLY FIXED
         """Check your current level and XP."""
         guild_id = ctx.guild.id
         user_id = ctx.author.id
-        if guild_id in self.user_data and user_id in self.user_data[guild_id]:
-            xp = self.user_data[guild_id][user_id]['xp']
+        user_data = self.backend.get_user(guild_id, user_id)
+        if user_data:
+            xp = user_data['xp']
             level = self.calculate_level(xp)
             next_level_xp = self.xp_for_next_level(level)
             embed = discord.Embed(
@@ -1519,7 +2493,7 @@ class LevelingSystem(commands.Cog):                         # FULLY FIXED
                 inline=False
             )
 
-            total_users = len(self.user_data.get(guild_id, {}))
+            total_users = self.backend.count_users(guild_id)
             embed.add_field(
                 name="Total Users with XP",
                 value=f"{total_users} users",
@@ -2125,21 +3099,25 @@ class AdvancedInviteTracker(commands.Cog):
         """Cache all invites when the bot is ready."""
         logger.info("Bot is ready. Syncing invites...")
         for guild in self.bot.guilds:
-            try:
-                invites = await guild.invites()
-                self.invite_cache[guild.id] = {
-                    invite.code: {
-                        "uses": invite.uses,
-                        "inviter": invite.inviter.name if invite.inviter else "Unknown",
-                        "created_at": invite.created_at.isoformat() if invite.created_at else "Unknown"
-                    }
-                    for invite in invites
-                }
-                self.update_database(guild.id, invites)
-            except discord.Forbidden:
-                logger.warning(f"Missing permission to fetch invites for guild: {guild.name}")
+            await self.sync_guild_invites(guild)
         logger.info("Invite sync complete.")
 
+    async def sync_guild_invites(self, guild: discord.Guild):
+        """Refresh the cached invite uses for one guild."""
+        try:
+            invites = await guild.invites()
+            self.invite_cache[guild.id] = {
+                invite.code: {
+                    "uses": invite.uses,
+                    "inviter": invite.inviter.name if invite.inviter else "Unknown",
+                    "created_at": invite.created_at.isoformat() if invite.created_at else "Unknown"
+                }
+                for invite in invites
+            }
+            self.update_database(guild.id, invites)
+        except discord.Forbidden:
+            logger.warning(f"Missing permission to fetch invites for guild: {guild.name}")
+
     def update_database(self, guild_id: int, invites: List[discord.Invite]):
         """Update the database with the latest invite data."""
         for invite in invites:
@@ -2152,6 +3130,9 @@ class AdvancedInviteTracker(commands.Cog):
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
         """Track which invite was used when a member joins."""
+        server_management = self.bot.get_cog("ServerManagement")
+        if server_management and server_management.in_raid_mode(member.guild.id):
+            return  # no invite diffing during a raid; the cache is re-synced when raid mode ends
         try:
             invites_before = self.invite_cache.get(member.guild.id, {})
             current_invites = await member.guild.invites()
@@ -2455,36 +3436,493 @@ def setup(bot):
     bot.add_cog(Analytics(bot))
 
 
+class LoggedAttachment(NamedTuple):
+    url: str
+    filename: str
+    size: int
+
+
+class LogSpool:
+    """Append-only log entries in numbered JSONL segment files, plus a checkpoint of what was delivered.
+
+    Appends are flushed to the OS on every write; the checkpoint is replaced atomically and fsynced.
+    Segments wholly before the checkpoint are deleted, so the spool only holds undelivered entries.
+    """
+
+    TORN = object()  # peek's marker for a line a crash or failed write cut short; it holds no entry
+
+    def __init__(self, directory: str, segment_bytes: int = 1024 * 1024):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.checkpoint_path = os.path.join(directory, "checkpoint.json")
+
+        for segment in self.segments():
+            if os.path.getsize(self.segment_path(segment)) == 0:
+                os.remove(self.segment_path(segment))  # opened by an earlier run but never written to
+        segments = self.segments()
+        self.read_segment, self.read_offset = (segments[0] if segments else 0), 0
+        if os.path.exists(self.checkpoint_path):
+            try:
+                with open(self.checkpoint_path, 'r') as f:
+                    checkpoint = json.load(f)
+                self.read_segment, self.read_offset = checkpoint["segment"], checkpoint["offset"]
+            except (json.JSONDecodeError, KeyError):
+                print(f"Failed to load {self.checkpoint_path}, replaying the whole spool.")
+
+        self.pending = self.count_pending()
+        # always start a fresh segment so a line torn by a crash is never continued
+        self.write_segment = max(segments[-1] + 1 if segments else 0, self.read_segment)
+        self.writer = open(self.segment_path(self.write_segment), 'ab')
+        self.torn = False  # the last write failed part way, so the next one starts a new segment
+        if not self.pending and segments:
+            self.read_segment, self.read_offset = self.write_segment, 0
+            self.save_checkpoint(self.read_segment, self.read_offset)  # everything was delivered, drop it
+
+    def segments(self) -> List[int]:
+        return sorted(int(name[:-len(".jsonl")]) for name in os.listdir(self.directory) if name.endswith(".jsonl"))
+
+    def segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{segment:08d}.jsonl")
+
+    def count_entries(self, segment: int, offset: int = 0) -> int:
+        try:
+            with open(self.segment_path(segment), 'rb') as f:
+                f.seek(offset)
+                return f.read().count(b"\n")
+        except FileNotFoundError:
+            return 0
+
+    def count_pending(self) -> int:
+        """Undelivered entries on disk from the read position on."""
+        return sum(
+            self.count_entries(segment, self.read_offset if segment == self.read_segment else 0)
+            for segment in self.segments() if segment >= self.read_segment
+        )
+
+    def rotate(self):
+        try:
+            self.writer.close()
+        except OSError:
+            pass  # only the tail of a failed write was still buffered
+        self.write_segment += 1
+        self.writer = open(self.segment_path(self.write_segment), 'ab')
+        self.torn = False
+
+    def append(self, entry: Dict):
+        line = json.dumps(entry).encode() + b"\n"
+        if self.torn or (self.writer.tell() and self.writer.tell() + len(line) > self.segment_bytes):
+            self.rotate()
+        try:
+            self.writer.write(line)
+            self.writer.flush()
+        except OSError:
+            self.torn = True  # part of the line may be on disk; writing behind it would corrupt the next entry
+            raise
+        self.pending += 1
+
+    def peek(self, limit: int) -> List[Tuple[Optional[Dict], Tuple[int, int]]]:
+        """Up to limit undelivered entries with the position just after each; None for a corrupt line, TORN for a torn one."""
+        entries = []
+        segment, offset = self.read_segment, self.read_offset
+        while len(entries) < limit and segment <= self.write_segment:
+            try:
+                with open(self.segment_path(segment), 'rb') as f:
+                    f.seek(offset)
+                    while len(entries) < limit:
+                        line = f.readline()
+                        if not line.endswith(b"\n"):
+                            if line and segment < self.write_segment:
+                                # torn by a crash or failed write and nothing will finish it; not counted in pending
+                                offset += len(line)
+                                entries.append((self.TORN, (segment, offset)))
+                            break
+                        offset += len(line)
+                        try:
+                            entries.append((json.loads(line), (segment, offset)))
+                        except json.JSONDecodeError:
+                            entries.append((None, (segment, offset)))
+            except FileNotFoundError:
+                pass
+            segment, offset = segment + 1, 0
+        return entries
+
+    def commit(self, position: Tuple[int, int], count: int) -> bool:
+        """Advance past delivered entries; False if the position was already passed by a drop."""
+        if position <= (self.read_segment, self.read_offset):
+            return False
+        self.read_segment, self.read_offset = position
+        self.pending -= count
+        return True
+
+    def drop_oldest_segment(self) -> int:
+        """Skip the undelivered rest of the oldest segment and return how many entries that was."""
+        if self.read_segment >= self.write_segment:
+            return 0
+        dropped = self.count_entries(self.read_segment, self.read_offset)
+        self.read_segment, self.read_offset = self.read_segment + 1, 0
+        self.pending -= dropped
+        self.save_checkpoint(self.read_segment, self.read_offset)
+        return dropped
+
+    def save_checkpoint(self, segment: int, offset: int):
+        """Persist the read position, then delete the segments it has moved past. Safe to run in a thread."""
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"segment": segment, "offset": offset}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+        for old in self.segments():
+            if old >= segment:
+                break
+            try:
+                os.remove(self.segment_path(old))
+            except OSError as e:
+                print(f"Failed to remove spool segment {old}: {e}")
+
+    def close(self):
+        self.writer.close()
+
+
+def stable_hash(text: str) -> int:
+    """64-bit hash that, unlike hash(), is the same in every process."""
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), 'big')
+
+
+class ConsistentHashRing:
+    """Maps keys onto nodes; adding or removing a node only moves the keys that sat next to it."""
+
+    REPLICAS = 100  # virtual points per node, evens out how many keys each node gets
+
+    def __init__(self, nodes: List[str]):
+        self.points = sorted(
+            (stable_hash(f"{node}#{replica}"), index)
+            for index, node in enumerate(nodes) for replica in range(self.REPLICAS)
+        )
+        self.hashes = [point for point, _ in self.points]
+
+    def route(self, key) -> int:
+        """Index of the node that owns key."""
+        position = bisect.bisect(self.hashes, stable_hash(str(key))) % len(self.hashes)
+        return self.points[position][1]
+
+
+class WebhookShard:
+    """One logging webhook with its own spool and worker, so a slow or rate-limited webhook only holds back its own guilds."""
+
+    def __init__(self, url: str, spool_dir: str, adopt_legacy: bool = False):
+        self.url = url
+        self.key = hashlib.sha1(url.encode()).hexdigest()[:12]  # names the spool without putting the token on disk
+        directory = os.path.join(spool_dir, self.key)
+        if adopt_legacy:
+            self.adopt_legacy_spool(spool_dir, directory)
+        self.spool = LogSpool(directory)
+        self.webhook: Optional[discord.Webhook] = None
+        self.guild_id: Optional[int] = None    # where the webhook posts; a Webhook.from_url does not know
+        self.channel_id: Optional[int] = None
+        self.wake = asyncio.Event()
+        self.task = None
+
+    @staticmethod
+    def adopt_legacy_spool(spool_dir: str, directory: str):
+        """Move a single-webhook spool (segments directly in spool_dir) into this shard so nothing queued is lost."""
+        if os.path.isdir(directory) or not os.path.isdir(spool_dir):
+            return
+        legacy = [name for name in os.listdir(spool_dir) if name.endswith(".jsonl") or name == "checkpoint.json"]
+        if not legacy:
+            return
+        os.makedirs(directory)
+        for name in legacy:
+            os.replace(os.path.join(spool_dir, name), os.path.join(directory, name))
+        print(f"Moved {len(legacy)} webhook spool files into {directory}")
+
+
 class WebhookLogger:
+    """Ships message and command logs to the logging webhooks from background workers.
+
+    log_message and log_command only build an embed and append it to an on-disk spool, so nothing
+    on the message path waits for a webhook. Each guild is pinned to one webhook by a consistent hash,
+    which keeps its logs in order while spreading guilds over every configured webhook. Each webhook's
+    worker drains its spool in as few sends as Discord allows and only moves the checkpoint once a
+    batch is delivered, so outages and 429s lose nothing.
+    """
+
+    MAX_EMBEDS = 10        # per webhook message
+    MAX_FILES = 10
+    MAX_EMBED_CHARS = 6000  # combined text of all embeds in one message
+    MAX_FIELDS = 25         # per embed
+    MAX_FIELD_VALUE = 1024
+    NOTES_FIELD = "📎 Attachment Notes"  # what happened to the mirrored files, added at send time
+    NOTE_CHARS = 200        # per attachment note, so take_batch can hold back room for them
+
     def __init__(self, bot):
         self.bot = bot
-        self.webhook_url = os.getenv('LOGGING_WEBHOOK_URL')
-        self.session = aiohttp.ClientSession()
+        # LOGGING_WEBHOOK_URLS takes a comma separated pool; LOGGING_WEBHOOK_URL still works for a single webhook
+        urls = os.getenv('LOGGING_WEBHOOK_URLS') or os.getenv('LOGGING_WEBHOOK_URL') or ''
+        urls = list(dict.fromkeys(url.strip() for url in urls.split(',') if url.strip()))
+        spool_dir = os.getenv('LOGGING_SPOOL_DIR', 'webhook_spool')
+        self.shards = [WebhookShard(url, spool_dir, adopt_legacy=index == 0) for index, url in enumerate(urls)]
+        self.ring = ConsistentHashRing([shard.key for shard in self.shards]) if self.shards else None
+        self.session: Optional[aiohttp.ClientSession] = None  # created in start, shared by every send and download
+        self.max_queue = int(os.getenv('LOGGING_QUEUE_SIZE', '100000'))  # undelivered entries kept on disk per webhook
+        self.overflow_policy = os.getenv('LOGGING_QUEUE_POLICY', 'drop_oldest')  # or drop_newest
+        self.batch_delay = 0.5  # seconds a burst gets to pile up before a worker sends it
+        self.max_backoff = 60   # seconds between retries while a webhook keeps failing
+        megabyte = 1024 * 1024
+        self.max_file_bytes = int(float(os.getenv('LOGGING_MAX_FILE_MB', '8')) * megabyte)
+        self.max_message_bytes = int(float(os.getenv('LOGGING_MAX_MESSAGE_MB', '25')) * megabyte)  # also caps one webhook send
+        self.spool_memory_bytes = megabyte  # downloads past this size spill from memory to a temp file
+        self.upload_cache: OrderedDict = OrderedDict()  # {sha256: jump URL of the log message that carries the file}
+        self.upload_cache_size = 1000
+        self.stats = {
+            "queued": 0, "sent": 0, "batches": 0, "dropped": 0, "failed": 0, "rate_limited": 0,
+            "deduplicated": 0, "link_only": 0
+        }
 
-    async def send_to_webhook(self, content=None, embeds=None, files=None):
-        if not self.webhook_url:
+    @property
+    def pending(self) -> int:
+        return sum(shard.spool.pending for shard in self.shards)
+
+    async def start(self):
+        """Open the pooled session and cached webhooks and start one worker per webhook; called once from setup_hook."""
+        if self.session is None or self.session.closed:
+            per_host = max(4, len(self.shards) + 2)  # every webhook lives on discord.com, so let each worker hold a socket
+            connector = aiohttp.TCPConnector(
+                limit=per_host * 2,     # plus as many again for attachment downloads from the CDN
+                limit_per_host=per_host,
+                keepalive_timeout=60,   # keep the Discord API and CDN connections warm between batches
+                ttl_dns_cache=300
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=None, connect=10, sock_read=30)
+            )
+            for shard in self.shards:
+                shard.webhook = discord.Webhook.from_url(shard.url, session=self.session)
+            await asyncio.gather(*(self.fetch_destination(shard) for shard in self.shards))
+        for shard in self.shards:
+            if shard.task is None or shard.task.done():
+                shard.task = self.bot.loop.create_task(self.process_queue(shard))
+
+    async def fetch_destination(self, shard: WebhookShard) -> bool:
+        """Look up the guild and channel a shard's webhook posts to, which message_url needs."""
+        try:
+            fetched = await shard.webhook.fetch()
+        except (discord.HTTPException, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Could not fetch logging webhook {shard.key}, dedupe links are off until it answers: {e}")
+            return False
+        shard.guild_id, shard.channel_id = fetched.guild_id, fetched.channel_id
+        return shard.guild_id is not None
+
+    @staticmethod
+    def message_url(shard: WebhookShard, message) -> str:
+        # message.jump_url comes out as /channels/@me/... because a webhook from a URL has no guild
+        return f"https://discord.com/channels/{shard.guild_id}/{shard.channel_id}/{message.id}"
+
+    async def close(self):
+        """Stop the workers and release the session; undelivered entries stay spooled for the next start."""
+        for shard in self.shards:
+            if shard.task:
+                shard.task.cancel()
+                try:
+                    await shard.task
+                except asyncio.CancelledError:
+                    pass
+                shard.task = None
+            shard.spool.close()
+            shard.webhook = None
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    def enqueue(self, guild_id: int, embed: discord.Embed, attachments=()):
+        """Spool an embed on the guild's webhook; when that spool is full the overflow policy decides what is lost."""
+        if not self.shards:
             return
+        shard = self.shards[self.ring.route(guild_id)]
+        spool = shard.spool
+        if spool.pending >= self.max_queue:
+            dropped = 0 if self.overflow_policy == 'drop_newest' else spool.drop_oldest_segment()
+            if not dropped:  # drop_newest, or everything left sits in the segment being written
+                self.stats["dropped"] += 1
+                return
+            self.stats["dropped"] += dropped
+        try:
+            spool.append({
+                "embed": embed.to_dict(),
+                "attachments": [[attachment.url, attachment.filename, attachment.size] for attachment in attachments]
+            })
+        except OSError as e:
+            self.stats["dropped"] += 1
+            print(f"Failed to spool log entry: {e}")
+            return
+        self.stats["queued"] += 1
+        shard.wake.set()
 
-        webhook = discord.Webhook.from_url(self.webhook_url, session=self.session)
+    async def process_queue(self, shard: WebhookShard):
+        backoff = 1
+        spool = shard.spool
+        while True:
+            if not spool.pending:
+                await shard.wake.wait()
+                shard.wake.clear()
+                await asyncio.sleep(self.batch_delay)
+            batch, position, count = self.take_batch(spool)
+            if position is None:
+                spool.pending = spool.count_pending()  # the counter drifted from the files, trust the files
+                continue
+            if batch and not await self.send_batch(shard, batch):
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            backoff = 1
+            if spool.commit(position, count):
+                try:
+                    await asyncio.to_thread(spool.save_checkpoint, *position)
+                except OSError as e:
+                    print(f"Failed to save webhook spool checkpoint: {e}")
 
-        try:
-            if isinstance(embeds, list) and len(embeds) > 0 and isinstance(embeds[0], discord.Embed):
-                await webhook.send(
-                    content=content,
-                    embeds=embeds,  
-                    files=files
-                )
-            else:
-                await webhook.send(
-                    content=content,
-                    embed=embeds[0] if embeds and isinstance(embeds[0], discord.Embed) else None, 
-                    files=files
-                )
-        except Exception as e:
-            print(f"Webhook send error details: {str(e)}")
+    def take_batch(self, spool: LogSpool):
+        """Read the longest run of spooled entries that fits in one webhook message.
 
+        Returns the batch, the spool position after its last entry and how many entries that covers,
+        corrupt lines included. The position is None when nothing could be read.
+        """
+        batch, files, chars, size = [], 0, 0, 0
+        position, count = None, 0
+        for entry, entry_position in spool.peek(self.MAX_EMBEDS):
+            if entry is LogSpool.TORN:
+                position = entry_position  # skipped without counting, pending never included it
+                continue
+            if entry is None:
+                self.stats["failed"] += 1
+                position, count = entry_position, count + 1
+                continue
+            embed = discord.Embed.from_dict(entry["embed"])
+            attachments = [LoggedAttachment(*attachment) for attachment in entry["attachments"]]
+            attachment_bytes = sum(attachment.size for attachment in attachments)
+            embed_chars = len(embed) + self.notes_reserve(attachments)
+            if batch and (
+                files + len(attachments) > self.MAX_FILES
+                or chars + embed_chars > self.MAX_EMBED_CHARS
+                or size + attachment_bytes > self.max_message_bytes
+            ):
+                break
+            batch.append((embed, attachments))
+            position, count = entry_position, count + 1
+            files += len(attachments)
+            chars += embed_chars
+            size += attachment_bytes
+        return batch, position, count
+
+    def notes_reserve(self, attachments) -> int:
+        """Characters send_batch may add to an embed when noting failed, oversized or duplicate files."""
+        if not attachments:
+            return 0
+        return len(self.NOTES_FIELD) + min(self.MAX_FIELD_VALUE, len(attachments) * (self.NOTE_CHARS + 1))
+
+    async def download(self, attachment):
+        """Stream an attachment into a spooled temp file while hashing it; (None, None) if it outgrows the file cap."""
+        spool = tempfile.SpooledTemporaryFile(max_size=self.spool_memory_bytes)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async with self.session.get(attachment.url) as response:
+                response.raise_for_status()
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    size += len(chunk)
+                    if size > self.max_file_bytes:
+                        spool.close()
+                        return None, None
+                    digest.update(chunk)
+                    spool.write(chunk)
+        except Exception:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool, digest.hexdigest()
+
+    async def send_batch(self, shard: WebhookShard, batch) -> bool:
+        """Send one batch; True once it is delivered or permanently rejected, False if it should be retried."""
+        files, spools, digests = [], [], []
+        notes = [[] for _ in batch]
+        try:
+            for (embed, attachments), embed_notes in zip(batch, notes):
+                for attachment in attachments:
+                    try:
+                        spool, digest = await self.download(attachment)
+                    except Exception as e:
+                        embed_notes.append(f"⚠️ Failed to process {attachment.filename}: {str(e)}")
+                        continue
+                    if spool is None:
+                        self.stats["link_only"] += 1
+                        embed_notes.append(f"⚠️ {attachment.filename} is over the size cap, linked only")
+                        continue
+                    earlier = self.upload_cache.get(digest)
+                    if earlier or digest in digests:
+                        spool.close()
+                        self.stats["deduplicated"] += 1
+                        if earlier:
+                            self.upload_cache.move_to_end(digest)
+                        where = earlier or "another file in this log message"
+                        embed_notes.append(f"♻️ {attachment.filename} is identical to {where}")
+                        continue
+                    spools.append(spool)
+                    digests.append(digest)
+                    files.append(discord.File(spool, filename=attachment.filename))
+
+            embeds = [embed for embed, _ in batch]
+            self.add_notes(embeds, notes)
+            # discord.py already waits out X-RateLimit-Reset-After between sends; this covers a 429 it gave up on
+            for attempt in range(2):
+                try:
+                    sent = await shard.webhook.send(embeds=embeds, files=files, wait=True)
+                    self.stats["sent"] += len(embeds)
+                    self.stats["batches"] += 1
+                    if digests and (shard.guild_id is not None or await self.fetch_destination(shard)):
+                        for digest in digests:
+                            self.upload_cache[digest] = self.message_url(shard, sent)
+                    while len(self.upload_cache) > self.upload_cache_size:
+                        self.upload_cache.popitem(last=False)
+                    return True
+                except discord.HTTPException as e:
+                    if e.status == 429 and attempt == 0:
+                        self.stats["rate_limited"] += 1
+                        await asyncio.sleep(float(e.response.headers.get('Retry-After', 1)))
+                        for file in files:
+                            file.reset()
+                        continue
+                    print(f"Webhook send error details: {str(e)}")
+                    if e.status == 429 or e.status >= 500:
+                        return False  # stays in the spool for the next attempt
+                    self.stats["failed"] += len(embeds)  # Discord rejected the batch itself, retrying will not help
+                    return True
+                except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                    print(f"Webhook send error details: {str(e)}")
+                    return False
+                except Exception as e:
+                    self.stats["failed"] += len(embeds)
+                    print(f"Webhook send error details: {str(e)}")
+                    return True
+            return False
+        finally:
+            for spool in spools:
+                spool.close()
+
+    def add_notes(self, embeds, notes):
+        """Add each embed's attachment notes as one field, within what is left of the message's limits."""
+        room = self.MAX_EMBED_CHARS - sum(len(embed) for embed in embeds)
+        for embed, embed_notes in zip(embeds, notes):
+            if not embed_notes or len(embed.fields) >= self.MAX_FIELDS:
+                continue
+            value = "\n".join(note[:self.NOTE_CHARS] for note in embed_notes)
+            value = value[:max(0, min(self.MAX_FIELD_VALUE, room - len(self.NOTES_FIELD)))]
+            if value:
+                embed.add_field(name=self.NOTES_FIELD, value=value, inline=False)
+                room -= len(self.NOTES_FIELD) + len(value)
 
-    async def log_message(self, message):
+    def log_message(self, message):
         if message.author.bot:
             return
 
@@ -2503,23 +3941,21 @@ class WebhookLogger:
         if message.edited_at:
             embed.add_field("Edited", message.edited_at.strftime("%Y-%m-%d %H:%M:%S"), inline=False)
 
-        files = []
-    
+        mirrored, mirrored_bytes = [], 0
         for attachment in message.attachments:
-            try:
-                file_data = await attachment.read()
-                file = discord.File(io.BytesIO(file_data), filename=attachment.filename)
-                files.append(file)
-            
-                file_info = (
-                    f"📎 Name: {attachment.filename}\n"
-                    f"📊 Size: {attachment.size:,} bytes\n"
-                    f"📑 Type: {attachment.content_type}\n"
-                    f"🔗 URL: {attachment.url}"
+            file_info = (
+                f"📎 Name: {attachment.filename}\n"
+                f"📊 Size: {attachment.size:,} bytes\n"
+                f"📑 Type: {attachment.content_type}\n"
+                f"🔗 URL: {attachment.url}"
             )
-                embed.add_field("File Attachment", file_info, inline=False)
-            except Exception as e:
-                embed.add_field("⚠️ File Error", f"Failed to process {attachment.filename}: {str(e)}", inline=False)
+            if attachment.size <= self.max_file_bytes and mirrored_bytes + attachment.size <= self.max_message_bytes:
+                mirrored.append(attachment)
+                mirrored_bytes += attachment.size
+            else:
+                self.stats["link_only"] += 1
+                file_info += "\n⚠️ Over the size cap, linked only"
+            embed.add_field("File Attachment", file_info, inline=False)
 
         message_link = f"https://discord.com/channels/{message.guild.id}/{message.channel.id}/{message.id}"
         embed.add_field("Message Link", message_link, inline=False)
@@ -2529,9 +3965,9 @@ class WebhookLogger:
         if message.author.avatar:
             embed.set_thumbnail(message.author.avatar.url)
 
-        await self.send_to_webhook(embeds=[embed.build()], files=files)
+        self.enqueue(message.guild.id, embed.build(), mirrored)
 
-    async def log_command(self, ctx):
+    def log_command(self, ctx):
         embed = EmbedBuilder(
             f"Command Used in {ctx.guild.name}",
             f"Command: {ctx.command}\nArgs: {ctx.args[2:]}"
@@ -2540,11 +3976,7 @@ class WebhookLogger:
         embed.add_field("User", f"{ctx.author} ({ctx.author.id})")
         embed.add_field("Channel", f"{ctx.channel.name} ({ctx.channel.id})")
         
-        await self.send_to_webhook(embeds=[embed.build()])
-
-    def __del__(self):
-        if self.session:
-            asyncio.create_task(self.session.close())
+        self.enqueue(ctx.guild.id, embed.build())
 
 class TicTacToeButton(discord.ui.Button):
     def __init__(self, x, y):
@@ -2885,14 +4317,7 @@ class Config(commands.Cog):
                 "support_roles": self.bot.get_cog("TicketSystem").support_roles.get(ctx.guild.id),
                 "admin_roles": self.bot.get_cog("TicketSystem").admin_roles.get(ctx.guild.id, [])
             },
-            "automod": {
-                "caps_threshold": self.bot.get_cog("AutoMod").caps_threshold,
-                "spam_threshold": getattr(self.bot.get_cog("AutoMod"), 'spam_threshold', 5),
-                "spam_interval": getattr(self.bot.get_cog("AutoMod"), 'spam_interval', 5),
-                "spam_timeout_minutes": getattr(self.bot.get_cog("AutoMod"), 'spam_timeout_minutes', 10), 
-                "banned_words": list(self.bot.get_cog("AutoMod").banned_words),
-                "link_whitelist": list(self.bot.get_cog("AutoMod").link_whitelist)
-            },
+            "automod": self.bot.get_cog("AutoMod").export_guild_config(ctx.guild.id),
             "mute_config": mute_config,
             "role_configs": self.serialize_color(dict(self.bot.get_cog("RoleManager").role_configs.get(ctx.guild.id, {}))),
             "analytics_config": analytics_config,
@@ -2954,12 +4379,18 @@ class Config(commands.Cog):
 
             automod = self.bot.get_cog("AutoMod")
             if automod:
-                automod.caps_threshold = config["automod"]["caps_threshold"]
-                automod.spam_threshold = config["automod"]["spam_threshold"]
-                automod.spam_interval = config["automod"].get("spam_interval", 5)
-                automod.spam_timeout_minutes = config["automod"].get("spam_timeout_minutes", 10)
-                automod.banned_words = set(config["automod"]["banned_words"])
-                automod.link_whitelist = set(config["automod"]["link_whitelist"])
+                await automod.update_guild_config(ctx.guild.id, {
+                    "caps_threshold": config["automod"]["caps_threshold"],
+                    "spam_threshold": config["automod"]["spam_threshold"],
+                    "spam_interval": config["automod"].get("spam_interval", 5),
+                    "spam_timeout_minutes": config["automod"].get("spam_timeout_minutes", 10),
+                    "duplicate_threshold": config["automod"].get("duplicate_threshold", 4),
+                    "duplicate_window": config["automod"].get("duplicate_window", 60),
+                    "shadow_mode": config["automod"].get("shadow_mode", False),
+                    # older exports carry the whole list; keep only what this server added
+                    "banned_words": sorted({word.lower() for word in config["automod"]["banned_words"]} - automod.banned_words),
+                    "link_whitelist": sorted(config["automod"]["link_whitelist"])
+                })
 
             role_configs = self.deserialize_color(config["role_configs"])
             self.bot.get_cog("RoleManager").role_configs[ctx.guild.id] = role_configs
@@ -3000,7 +4431,7 @@ class Config(commands.Cog):
             leveling_cog = self.bot.get_cog("LevelingSystem")
             if leveling_cog and "leveling_config" in config:
                 leveling_config = config["leveling_config"]
-                leveling_cog.roles[ctx.guild.id] = leveling_config.get("roles", {})
+                leveling_cog.roles[ctx.guild.id] = leveling_cog.level_role_map(leveling_config.get("roles", {}))
 
 
                 leveling_cog.xp_multipliers[ctx.guild.id] = {
@@ -3014,6 +4445,12 @@ class Config(commands.Cog):
                 leveling_cog.achievements[ctx.guild.id] = leveling_config.get("achievements", {})
                 leveling_cog.xp_decay_rate = leveling_config.get("xp_decay_rate", 0.01)
                 leveling_cog.xp_gain_range = leveling_config.get("xp_gain_range", (15, 25))
+                leveling_cog.backend.decay_rate = leveling_cog.xp_decay_rate
+                leveling_cog.rebuild_multiplier_index()
+                leveling_cog.rebuild_level_role_index()
+                leveling_cog.rebuild_achievement_index()
+                leveling_cog.leaderboard_messages.pop(ctx.guild.id, None)
+                leveling_cog.save_data(ctx.guild.id)
 
                 if leveling_config.get("leaderboard_channel_id"):
                     leaderboard_channel = ctx.guild.get_channel(leveling_config["leaderboard_channel_id"])
@@ -4660,14 +6097,275 @@ def setup(bot):
 bot.add_cog(ModerationCommands(bot))
 bot.add_cog(TicketSystem(bot))
 
+class JoinBurstDetector:
+    """Joins to one guild within the last window seconds plus a histogram of the joining accounts' ages."""
+
+    AGE_BUCKETS = (1, 7, 30, 365)  # upper bounds in days, anything older lands in the last bucket
+    BUCKET_LABELS = ("< 1 day", "< 1 week", "< 1 month", "< 1 year", "Older")
+
+    def __init__(self, window: float):
+        self.window = window
+        self.joins = deque()  # (monotonic time, member, age bucket)
+        self.histogram = [0] * len(self.BUCKET_LABELS)
+
+    @classmethod
+    def age_bucket(cls, age_days: float) -> int:
+        return bisect.bisect_right(cls.AGE_BUCKETS, age_days)
+
+    def add(self, member, age_days: float, now: float):
+        self.prune(now)
+        bucket = self.age_bucket(age_days)
+        self.joins.append((now, member, bucket))
+        self.histogram[bucket] += 1
+
+    def prune(self, now: float) -> int:
+        """Forget joins older than the window and return how many are left."""
+        cutoff = now - self.window
+        while self.joins and self.joins[0][0] <= cutoff:
+            _, _, bucket = self.joins.popleft()
+            self.histogram[bucket] -= 1
+        return len(self.joins)
+
+    def younger_than(self, age_days: float) -> int:
+        """Joins in the window from accounts younger than age_days, which should be one of AGE_BUCKETS."""
+        return sum(self.histogram[:self.age_bucket(age_days)])
+
+
 class ServerManagement(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.autorole_dict = {}
+        self.raid_window = 30              # seconds of joins the detector looks at
+        self.raid_join_threshold = 10      # joins in the window that trip raid mode when half are young accounts
+        self.raid_hard_threshold = 30      # joins in the window that trip raid mode whatever the account ages
+        self.raid_account_age_days = 7     # accounts younger than this count as young and get kicked during a raid
+        self.raid_mode_minutes = 10        # raid mode ends this long after the last join burst
+        self.raid_kick_spacing = 1.0       # seconds between kicks
+        self.join_detectors: Dict[int, JoinBurstDetector] = {}
+        self.raid_mode: Dict[int, float] = {}  # {guild_id: monotonic time raid mode ends}
+        self.raid_locked_channels: Dict[int, Dict[int, Optional[bool]]] = {}  # {guild_id: {channel_id: previous send_messages}}
+        self.raid_kick_queues: Dict[int, Dict[int, discord.Member]] = {}
+        self.raid_kick_workers: Dict[int, asyncio.Task] = {}
+        self.raid_joins: Dict[int, Dict[int, discord.Member]] = {}  # {guild_id: joins whose autorole waits for the raid to end}
+        self.raid_autorole_workers: Dict[int, asyncio.Task] = {}
+        self.raid_locks: Dict[int, asyncio.Lock] = {}  # keeps start_raid_mode and end_raid_mode from interleaving
+        self.raid_sweep_task = None
+
+    async def cog_load(self):
+        self.raid_sweep_task = asyncio.create_task(self.sweep_raid_mode())
+
+    async def cog_unload(self):
+        if self.raid_sweep_task:
+            self.raid_sweep_task.cancel()
+        for task in self.raid_kick_workers.values():
+            task.cancel()
+        for task in self.raid_autorole_workers.values():
+            task.cancel()
+
+    def in_raid_mode(self, guild_id: int) -> bool:
+        return guild_id in self.raid_mode
+
+    def raid_kick_pending(self, member) -> bool:
+        return member.id in self.raid_kick_queues.get(member.guild.id, ())
+
+    def is_join_burst(self, detector: JoinBurstDetector) -> bool:
+        joins = len(detector.joins)
+        if joins >= self.raid_hard_threshold:
+            return True
+        return joins >= self.raid_join_threshold and detector.younger_than(self.raid_account_age_days) * 2 >= joins
+
+    def record_join(self, member) -> bool:
+        """Feed a join to the guild's detector; returns True while the guild is in raid mode."""
+        guild_id = member.guild.id
+        if member.bot:
+            return guild_id in self.raid_mode  # bots are added by admins, so they never count toward a burst
+        now = time.monotonic()
+        detector = self.join_detectors.get(guild_id)
+        if detector is None:
+            detector = self.join_detectors[guild_id] = JoinBurstDetector(self.raid_window)
+        age_days = (datetime.now(timezone.utc) - member.created_at).total_seconds() / 86400
+        detector.add(member, age_days, now)
+        burst = self.is_join_burst(detector)
+
+        if guild_id in self.raid_mode:
+            if burst:
+                self.raid_mode[guild_id] = now + self.raid_mode_minutes * 60
+            if age_days < self.raid_account_age_days:
+                self.queue_raid_kick(member)
+            return True
+
+        if not burst:
+            return False
+
+        # decided synchronously so the join listeners scheduled after this one already see raid mode
+        self.raid_mode[guild_id] = now + self.raid_mode_minutes * 60
+        young_bucket = detector.age_bucket(self.raid_account_age_days)
+        for _, joined, bucket in detector.joins:
+            if bucket < young_bucket:
+                self.queue_raid_kick(joined)
+        self.bot.loop.create_task(self.start_raid_mode(member.guild, list(detector.histogram)))
+        return True
+
+    def queue_raid_kick(self, member):
+        queue = self.raid_kick_queues.setdefault(member.guild.id, {})
+        queue[member.id] = member
+        worker = self.raid_kick_workers.get(member.guild.id)
+        if worker is None or worker.done():
+            self.raid_kick_workers[member.guild.id] = self.bot.loop.create_task(self.process_raid_kicks(member.guild.id))
+
+    async def process_raid_kicks(self, guild_id: int):
+        """Kick queued raid accounts one at a time, spaced out to stay within the kick rate limit."""
+        queue = self.raid_kick_queues.get(guild_id)
+        kicked = 0
+        while queue:
+            member_id = next(iter(queue))
+            member = queue.pop(member_id)
+            try:
+                await member.kick(reason="Raid protection: new account joined during a join raid")
+                kicked += 1
+            except (discord.Forbidden, discord.NotFound, discord.HTTPException) as e:
+                print(f"Raid protection could not kick {member_id} in guild {guild_id}: {e}")
+            await asyncio.sleep(self.raid_kick_spacing)
+        self.raid_kick_queues.pop(guild_id, None)
+        self.raid_kick_workers.pop(guild_id, None)
+        if kicked:
+            print(f"Raid protection kicked {kicked} accounts in guild {guild_id}")
+
+    def raid_alert_channel(self, guild):
+        return discord.utils.get(guild.text_channels, name='mod-logs') or guild.system_channel
+
+    def raid_lock(self, guild_id: int) -> asyncio.Lock:
+        if guild_id not in self.raid_locks:
+            self.raid_locks[guild_id] = asyncio.Lock()
+        return self.raid_locks[guild_id]
+
+    def histogram_field(self, histogram: List[int]) -> str:
+        return "\n".join(f"{label}: {count}" for label, count in zip(JoinBurstDetector.BUCKET_LABELS, histogram))
+
+    async def start_raid_mode(self, guild, histogram: List[int]):
+        """Lock every channel @everyone can write in and tell the moderators why."""
+        everyone = guild.default_role
+        async with self.raid_lock(guild.id):
+            if not self.in_raid_mode(guild.id):
+                return  # ended before this task got the lock
+            locked = self.raid_locked_channels.setdefault(guild.id, {})
+            for channel in guild.text_channels:
+                if not self.in_raid_mode(guild.id):
+                    break  # end_raid_mode is waiting on the lock and restores what was locked so far
+                if channel.id in locked or not channel.permissions_for(everyone).send_messages:
+                    continue  # already locked, or private and staff channels @everyone cannot post in anyway
+                previous = channel.overwrites_for(everyone).send_messages
+                try:
+                    await self.set_send_messages(channel, False)
+                    locked[channel.id] = previous
+                except (discord.Forbidden, discord.HTTPException) as e:
+                    print(f"Raid protection could not lock {channel} in {guild}: {e}")
+            if not self.in_raid_mode(guild.id):
+                return
+
+        channel = self.raid_alert_channel(guild)
+        if channel:
+            embed = EmbedBuilder(
+                "🚨 Raid Mode Enabled",
+                f"{sum(histogram)} members joined within {self.raid_window} seconds. "
+                f"{len(locked)} channels are locked, welcome messages and invite tracking are paused, "
+                f"autorole waits until raid mode ends, and accounts younger than {self.raid_account_age_days} "
+                f"days are kicked. Verification still runs."
+            ).set_color(discord.Color.red())
+            embed.add_field("Account Age", self.histogram_field(histogram))
+            embed.set_footer("Use !raidmode off to end raid mode early")
+            try:
+                await channel.send(embed=embed.build())
+            except (discord.Forbidden, discord.HTTPException) as e:
+                print(f"Raid protection could not alert {guild}: {e}")
+
+    async def end_raid_mode(self, guild):
+        """Restore the channels raid mode locked and re-sync invites missed while tracking was paused."""
+        self.raid_mode.pop(guild.id, None)  # a start_raid_mode still locking channels stops at its next one
+        async with self.raid_lock(guild.id):
+            locked = self.raid_locked_channels.pop(guild.id, {})
+            for channel_id, previous in locked.items():
+                channel = guild.get_channel(channel_id)
+                if channel:
+                    try:
+                        await self.set_send_messages(channel, previous)
+                    except (discord.Forbidden, discord.HTTPException) as e:
+                        print(f"Raid protection could not unlock {channel} in {guild}: {e}")
+
+        invite_tracker = self.bot.get_cog("AdvancedInviteTracker")
+        if invite_tracker:
+            await invite_tracker.sync_guild_invites(guild)
+
+        deferred = len(self.raid_joins.get(guild.id, ()))
+        worker = self.raid_autorole_workers.get(guild.id)
+        if deferred and (worker is None or worker.done()):
+            self.raid_autorole_workers[guild.id] = self.bot.loop.create_task(self.assign_raid_autoroles(guild))
+
+        channel = self.raid_alert_channel(guild)
+        if channel:
+            embed = EmbedBuilder(
+                "✅ Raid Mode Ended",
+                f"{len(locked)} channels were unlocked and join handling is back to normal. "
+                f"{deferred} members who joined during the raid are getting their autorole now."
+            ).set_color(discord.Color.green()).build()
+            try:
+                await channel.send(embed=embed)
+            except (discord.Forbidden, discord.HTTPException) as e:
+                print(f"Raid protection could not alert {guild}: {e}")
+
+    async def assign_raid_autoroles(self, guild):
+        """Give the autorole to members who joined during a raid, spaced out like the raid kicks."""
+        joins = self.raid_joins.pop(guild.id, {})
+        role = guild.get_role(self.autorole_dict[guild.id]) if guild.id in self.autorole_dict else None
+        assigned = 0
+        while joins and role:
+            if self.in_raid_mode(guild.id):
+                self.raid_joins.setdefault(guild.id, {}).update(joins)  # a new raid started; wait for it to end
+                break
+            member_id = next(iter(joins))
+            joins.pop(member_id)
+            member = guild.get_member(member_id)
+            if member is None or role in member.roles:
+                continue  # kicked, left, or already given the role
+            try:
+                await member.add_roles(role, reason="Autorole held back during raid mode")
+                assigned += 1
+            except (discord.Forbidden, discord.HTTPException) as e:
+                print(f"Could not assign the autorole to {member_id} in guild {guild.id}: {e}")
+            await asyncio.sleep(self.raid_kick_spacing)
+        self.raid_autorole_workers.pop(guild.id, None)
+        if assigned:
+            print(f"Assigned the autorole to {assigned} members who joined during the raid in guild {guild.id}")
+
+    async def sweep_raid_mode(self):
+        """End raid mode once a guild has gone raid_mode_minutes without a join burst, and drop idle detectors."""
+        while True:
+            await asyncio.sleep(self.raid_window)
+            now = time.monotonic()
+            for guild_id, until in list(self.raid_mode.items()):
+                guild = self.bot.get_guild(guild_id)
+                if guild is None:
+                    self.raid_mode.pop(guild_id, None)
+                elif now >= until:
+                    await self.end_raid_mode(guild)
+            self.join_detectors = {
+                guild_id: detector for guild_id, detector in self.join_detectors.items()
+                if detector.prune(now)
+            }
+
+    async def set_send_messages(self, channel, allowed: Optional[bool]):
+        """Set @everyone's send_messages overwrite in a channel; shared by lockdown, unlock and raid mode."""
+        perms = channel.overwrites_for(channel.guild.default_role)
+        perms.send_messages = allowed
+        await channel.set_permissions(channel.guild.default_role, overwrite=perms)
 
     @commands.Cog.listener()
     async def on_member_join(self, member):
-        """Handles delayed autorole assignment for new members"""
+        """Feeds the raid detector, then handles delayed autorole assignment for new members"""
+        if self.record_join(member):
+            if not self.raid_kick_pending(member):
+                self.raid_joins.setdefault(member.guild.id, {})[member.id] = member  # assign_raid_autoroles picks it up
+            return
         if hasattr(self, 'autorole_dict') and member.guild.id in self.autorole_dict:
             await asyncio.sleep(5)  
             role = member.guild.get_role(self.autorole_dict[member.guild.id])
@@ -4682,9 +6380,7 @@ class ServerManagement(commands.Cog):
     @commands.has_permissions(manage_channels=True)
     async def lockdown(self, ctx, channel: discord.TextChannel = None, minutes: int = None):
         channel = channel or ctx.channel
-        perms = channel.overwrites_for(ctx.guild.default_role)
-        perms.send_messages = False
-        await channel.set_permissions(ctx.guild.default_role, overwrite=perms)
+        await self.set_send_messages(channel, False)
     
         embed = EmbedBuilder(
         "🔒 Channel Lockdown",
@@ -4698,8 +6394,7 @@ class ServerManagement(commands.Cog):
             await ctx.send(embed=embed.build())
         
             await asyncio.sleep(minutes * 60)
-            perms.send_messages = True
-            await channel.set_permissions(ctx.guild.default_role, overwrite=perms)
+            await self.set_send_messages(channel, True)
         
             unlock_embed = EmbedBuilder(
             "🔓 Channel Unlocked",
@@ -4716,9 +6411,7 @@ class ServerManagement(commands.Cog):
     @commands.has_permissions(manage_channels=True)
     async def unlock(self, ctx, channel: discord.TextChannel = None):
         channel = channel or ctx.channel
-        perms = channel.overwrites_for(ctx.guild.default_role)
-        perms.send_messages = True
-        await channel.set_permissions(ctx.guild.default_role, overwrite=perms)
+        await self.set_send_messages(channel, True)
         
         embed = EmbedBuilder(
             "🔓 Channel Unlocked",
@@ -4728,6 +6421,38 @@ class ServerManagement(commands.Cog):
         
         await ctx.send(embed=embed.build())
 
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def raidmode(self, ctx, state: str = None):
+        """Show the join detector, or switch raid mode on or off by hand."""
+        if state == "on":
+            if self.in_raid_mode(ctx.guild.id):
+                return await ctx.send("Raid mode is already on.")
+            self.raid_mode[ctx.guild.id] = time.monotonic() + self.raid_mode_minutes * 60
+            detector = self.join_detectors.get(ctx.guild.id)
+            histogram = list(detector.histogram) if detector else [0] * len(JoinBurstDetector.BUCKET_LABELS)
+            await self.start_raid_mode(ctx.guild, histogram)
+            return
+        if state == "off":
+            if not self.in_raid_mode(ctx.guild.id):
+                return await ctx.send("Raid mode is not on.")
+            await self.end_raid_mode(ctx.guild)
+            return
+
+        detector = self.join_detectors.get(ctx.guild.id)
+        if detector:
+            detector.prune(time.monotonic())
+        histogram = detector.histogram if detector else [0] * len(JoinBurstDetector.BUCKET_LABELS)
+        embed = EmbedBuilder(
+            "🛡️ Raid Protection",
+            f"Raid mode is **{'on' if self.in_raid_mode(ctx.guild.id) else 'off'}**. "
+            f"It turns on at {self.raid_join_threshold} joins within {self.raid_window} seconds when half are "
+            f"accounts younger than {self.raid_account_age_days} days, or at {self.raid_hard_threshold} joins regardless."
+        ).set_color(discord.Color.blue())
+        embed.add_field(f"Joins in the last {self.raid_window}s", self.histogram_field(histogram))
+        embed.set_footer("Use !raidmode on or !raidmode off to switch it by hand")
+        await ctx.send(embed=embed.build())
+
     @commands.command()
     @commands.has_permissions(manage_messages=True)
     async def slowmode(self, ctx, seconds: int):
@@ -5134,6 +6859,12 @@ class ServerInfo(commands.Cog):
         embed.add_field("Python Version", platform.python_version())
         embed.add_field("Discord.py Version", discord.__version__)
         embed.add_field("Script Version",  (ZygnalBot_Version))
+        if self.bot.webhook_logger:
+            log_stats = self.bot.webhook_logger.stats
+            embed.add_field("Log Queue", (
+                f"{self.bot.webhook_logger.pending} waiting on {len(self.bot.webhook_logger.shards)} webhooks, {log_stats['sent']} sent in {log_stats['batches']} batches, "
+                f"{log_stats['dropped']} dropped, {log_stats['failed']} failed"
+            ))
     
         if self.bot.user.avatar:
             embed.set_thumbnail(url=self.bot.user.avatar.url)
@@ -5210,6 +6941,7 @@ class HelpView(discord.ui.View):
                     "!mutesetup": "who ever gets muted gets this role you configured with that command",
                     "!lockdown [channel] [Min]": "Lock a channel | (optional) for a specified time",
                     "!unlock [channel]": "Unlock a channel",
+                    "!raidmode [on/off]": "Show join raid protection | switch raid mode by hand",
                     "!slowmode <seconds>": "Set channel slowmode",
                     "!announce <color (optional/HEX code!)> #channel <message with or no links>": "send a announcement to a channel",
                     "!addrole <user> <role>": "Add a role to a user",
@@ -5410,424 +7142,610 @@ class HelpSystem(commands.Cog):
         
         await ctx.send(embed=embed.build(), view=HelpView())
 
+LEET_MAP = {
+    '0': 'o', '1': 'i', '3': 'e', '4': 'a', '5': 's', '6': 'g', '7': 't', '8': 'b', '9': 'g',
+    '@': 'a', '$': 's', '!': 'i', '|': 'l', '€': 'e',
+}
+CONFUSABLES_MAP = {  # look-alike letters that NFKD does not fold to ASCII
+    'а': 'a', 'в': 'b', 'е': 'e', 'к': 'k', 'м': 'm', 'н': 'h', 'о': 'o', 'р': 'p', 'с': 'c',
+    'т': 't', 'у': 'y', 'х': 'x', 'і': 'i', 'ј': 'j', 'ѕ': 's', 'ԁ': 'd', 'ɡ': 'g',
+    'α': 'a', 'β': 'b', 'ε': 'e', 'ι': 'i', 'κ': 'k', 'ν': 'v', 'ο': 'o', 'ρ': 'p', 'τ': 't', 'υ': 'u',
+    'ø': 'o', 'ł': 'l', 'đ': 'd',
+}
+TEXT_SEPARATORS = ".,_-*~#+'`\"^=/\\:;()[]{}<>"  # dropped so "h.u.r.e" reads as "hure"; spaces are kept
+NORMALIZE_TABLE = str.maketrans({**CONFUSABLES_MAP, **LEET_MAP, **dict.fromkeys(TEXT_SEPARATORS)})
+
+# LEET_MAP gives each glyph one reading, but several have more ("s1ut", "sl@t" and "wh@re", "h@tl3r";
+# "!" and "|" are also stuffed into words as junk, "fa!got"), and masking symbols hide a letter ("f**k",
+# "c.nt"). BannedWordMatcher.find_ambiguous tries every reading of the text GLYPH_TABLE leaves behind:
+# glyphs stay as they are and masks collapse into the two kinds below.
+GLYPH_CLASSES = {**LEET_MAP, '0': 'ou', '1': 'il', '|': 'il', '!': 'il', '@': 'aeiou'}
+STRONG_MASK, WEAK_MASK = '*', '.'  # strong: "*" and friends; weak: punctuation that is usually a separator
+SKIPPABLE_GLYPHS = STRONG_MASK + WEAK_MASK + '!|'
+MASKED_RUN = 1 << 16  # run length recorded for a masked letter, so any doubled letter it hides still counts
+GLYPH_TABLE = str.maketrans({
+    **CONFUSABLES_MAP,
+    **dict.fromkeys(TEXT_SEPARATORS),
+    **dict.fromkeys("*#~&+", STRONG_MASK), **dict.fromkeys("._-", WEAK_MASK),
+})
+AMBIGUOUS_GLYPHS = re.compile(r'[0-9|!@$€*#~&+]|[a-z][._\-][a-z]')  # weak masks only count inside a word
+
+
+def fold_text(text: str) -> str:
+    """Fold case and accents; normalize_text and the ambiguous-glyph pass both start from this."""
+    text = text.casefold()
+    if not text.isascii():
+        folded = []
+        for char in unicodedata.normalize('NFKD', text):
+            if unicodedata.combining(char) and folded and folded[-1].isascii():
+                continue  # drop accents on Latin letters, keep marks other scripts depend on
+            folded.append(char)
+        text = unicodedata.normalize('NFC', ''.join(folded))
+    return text
+
+
+def normalize_text(text: str) -> str:
+    """Fold case, accents, confusables, leetspeak and separators so bypass spellings match their root."""
+    return fold_text(text).translate(NORMALIZE_TABLE)
+
+
+def fold_repeats(text: str) -> Tuple[str, List[int]]:
+    """Split text into its characters with repeats folded and the length of each run."""
+    chars, runs = [], []
+    for char in text:
+        if chars and chars[-1] == char:
+            runs[-1] += 1
+        else:
+            chars.append(char)
+            runs.append(1)
+    return ''.join(chars), runs
+
+
+class BannedWordMatcher:
+    """Aho-Corasick automaton over the normalized banned words.
+
+    Finding a hit costs one pass over the message no matter how many words are banned.
+    Repeated characters are folded while scanning, so "huuure" hits "hure"; a root that
+    doubles a letter ("nigger") still needs at least that many in the text, so it does
+    not fire on "niger".
+
+    ``variants`` are spellings no reading of a root reaches ("p*ss", "encoulé"); they are
+    kept in GLYPH_TABLE form, so only their exact glyphs match them.
+    """
+
+    MAX_AMBIGUOUS_STATES = 1024  # bounds find_ambiguous on adversarial text
+    MAX_GLYPH_GAP = 4            # masks or skipped glyphs in a row before a path is dropped
+    MAX_MASKED = 3               # letters one match may hide behind masks
+
+    def __init__(self, words, variants=()):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[str, Tuple[int, ...]]]] = [[]]  # (word, run lengths) ending here
+
+        entries = [(word, normalize_text(word)) for word in words]
+        entries += [(variant, fold_text(variant).translate(GLYPH_TABLE)) for variant in variants]
+        for word, text in entries:
+            chars, runs = fold_repeats(text)
+            if not chars:
+                continue
+            state = 0
+            for char in chars:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append((word, tuple(runs)))
+        self.own_output = [list(words) for words in self.output]  # before suffix words are merged in
+
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                if state:
+                    self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    @staticmethod
+    def _confirm(candidates, runs: List[int]) -> Optional[str]:
+        for word, required in candidates:
+            offset = len(runs) - len(required)
+            if all(runs[offset + i] >= count for i, count in enumerate(required)):
+                return word
+        return None
+
+    def find(self, text: str) -> Optional[str]:
+        """Return the first banned word found in already normalized text, or None."""
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        previous = None
+        runs: List[int] = []
+        for char in text:
+            if char == previous:
+                runs[-1] += 1
+                continue
+            if output[state]:  # the run that completed a word has ended, check its length
+                word = self._confirm(output[state], runs)
+                if word is not None:
+                    return word
+            previous = char
+            runs.append(1)
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+        return self._confirm(output[state], runs) if output[state] else None
+
+    def find_ambiguous(self, folded: str) -> Optional[str]:
+        """Slower pass over fold_text() output that tries every reading of ambiguous glyphs and masks.
+
+        Walks the trie as an NFA; each path is (state, run lengths, last letter, masked letters, weak mask
+        used, glyphs since the last letter). A mask may stand for one letter (covering a doubled one, "ca#o")
+        or be skipped ("!" and "|" may be skipped too), but never starts a match, stands for at most half of
+        the root, and the weak ones (". _ -") only count inside roots of four or more letters. Unlike find(),
+        matches only start at the beginning of a word, which keeps masks from branching at every letter.
+        """
+        goto, own_output = self.goto, self.own_output
+        paths = set()
+        previous = ' '
+        for char in folded.translate(GLYPH_TABLE):
+            readings = GLYPH_CLASSES.get(char, '') + char  # the glyph itself still matches variants
+            skippable = char in SKIPPABLE_GLYPHS
+            advanced = set()
+            starts = {(0, (), None, 0, False, 0)} if previous.isspace() else set()
+            previous = char
+            for state, runs, last, masked, weak, gap in paths | starts:
+                gap = gap + 1 if skippable else 0
+                if gap > self.MAX_GLYPH_GAP:
+                    continue
+                if state and skippable:
+                    advanced.add((state, runs, last, masked, weak, gap))  # read as a separator
+                    if (char == STRONG_MASK or char == WEAK_MASK) and masked < self.MAX_MASKED:
+                        weak_mask = weak or char == WEAK_MASK
+                        for letter, child in goto[state].items():
+                            if letter.islower():
+                                advanced.add((child, runs + (MASKED_RUN,), letter, masked + 1, weak_mask, gap))
+                for letter in readings:
+                    if letter == last:
+                        advanced.add((state, runs[:-1] + (runs[-1] + 1,), last, masked, weak, gap))
+                        continue
+                    child = goto[state].get(letter)
+                    if child is not None:
+                        advanced.add((child, runs + (1,), letter, masked, weak, gap))
+            for state, runs, _, masked, weak, _ in advanced:
+                for word, required in own_output[state]:
+                    if masked and (masked * 2 > len(required) or weak and len(required) < 4):
+                        continue
+                    if all(have >= need for have, need in zip(runs, required)):
+                        return word
+            if len(advanced) > self.MAX_AMBIGUOUS_STATES:
+                advanced = set(itertools.islice(advanced, self.MAX_AMBIGUOUS_STATES))
+            paths = advanced
+        return None
+
+
+MINHASH_BINS = 16
+MINHASH_EMPTY = 1 << 60  # above any 60-bit bin value
+
+
+def minhash(tokens) -> Tuple[int, ...]:
+    """One-permutation MinHash: each token hash goes to one of 16 bins and each bin keeps its minimum."""
+    signature = [MINHASH_EMPTY] * MINHASH_BINS
+    for token in tokens:
+        h = hash(token) & 0xFFFFFFFFFFFFFFFF
+        bin_index, value = h & (MINHASH_BINS - 1), h >> 4
+        if value < signature[bin_index]:
+            signature[bin_index] = value
+    return tuple(signature)
+
+
+def minhash_similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity, counting only bins at least one side filled."""
+    used = matching = 0
+    for x, y in zip(a, b):
+        if x != MINHASH_EMPTY or y != MINHASH_EMPTY:
+            used += 1
+            matching += x == y
+    return matching / used if used else 0.0
+
+
+def message_shingles(text: str) -> set:
+    """Words and word pairs of the normalized text."""
+    words = text.split()
+    return set(words) | {f"{first} {second}" for first, second in zip(words, words[1:])}
+
+
+class MessageFingerprints:
+    """Short-lived ring buffer of one guild's messages, by normalized text hash and MinHash signature.
+
+    Exact copies are counted by text hash first; a message of three or four words often fills
+    too few bins to complete a band, so the bands alone would miss it.
+    Signatures are also filed under LSH bands of two bins each, so a lookup only compares
+    against messages that agree on a whole band instead of scanning the buffer. Only bands
+    with every bin filled are used, and a lookup reads at most MAX_CANDIDATES of the newest
+    entries per band, so a popular band cannot turn a lookup into a scan.
+    """
+
+    BAND_ROWS = 2
+    MIN_SIMILARITY = 0.5
+    MAX_CANDIDATES = 32
+
+    def __init__(self, window: float, size: int):
+        self.window = window
+        self.size = size
+        self.entries: deque = deque()  # (time, signature, user_id, channel_id, text_hash), oldest first
+        self.buckets: Dict[Tuple[int, ...], deque] = {}
+        self.exact: Dict[int, deque] = {}  # {text_hash: entries with that text}
+
+    @classmethod
+    def band_keys(cls, signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        keys = []
+        for start in range(0, len(signature), cls.BAND_ROWS):
+            band = signature[start:start + cls.BAND_ROWS]
+            if MINHASH_EMPTY not in band:  # a half-empty band is keyed by one token and pairs up unrelated texts
+                keys.append((start,) + band)
+        return keys
+
+    def prune(self, now: float) -> int:
+        """Evict entries older than the window or beyond the size cap; returns what is left."""
+        cutoff = now - self.window
+        while self.entries and (len(self.entries) > self.size or self.entries[0][0] <= cutoff):
+            entry = self.entries.popleft()
+            for key in self.band_keys(entry[1]):
+                bucket = self.buckets[key]
+                bucket.popleft()  # entries leave in arrival order, so it is the oldest in each bucket
+                if not bucket:
+                    del self.buckets[key]
+            copies = self.exact[entry[4]]
+            copies.popleft()
+            if not copies:
+                del self.exact[entry[4]]
+        return len(self.entries)
+
+    def add(self, text_hash: int, signature: Tuple[int, ...], now: float, user_id: int, channel_id: int,
+            limit: int) -> List[Tuple]:
+        """Record a message and return up to limit earlier copies or near-duplicates still in the window."""
+        self.prune(now)
+        matches = list(itertools.islice(reversed(self.exact.get(text_hash, ())), limit))
+        seen = {id(entry) for entry in matches}
+        keys = self.band_keys(signature)
+        for key in keys if len(matches) < limit else ():
+            for entry in itertools.islice(reversed(self.buckets.get(key, ())), self.MAX_CANDIDATES):
+                if id(entry) in seen:
+                    continue
+                seen.add(id(entry))
+                if minhash_similarity(entry[1], signature) >= self.MIN_SIMILARITY:
+                    matches.append(entry)
+                    if len(matches) >= limit:
+                        break
+            if len(matches) >= limit:
+                break
+
+        entry = (now, signature, user_id, channel_id, text_hash)
+        self.entries.append(entry)
+        for key in keys:
+            self.buckets.setdefault(key, deque()).append(entry)
+        self.exact.setdefault(text_hash, deque()).append(entry)
+        return matches
+
+
+URL_PATTERN = re.compile(r'https?://[^\s<>]+|\bdiscord\.gg/[^\s<>]*', re.IGNORECASE)
+
+
+def split_link(url: str) -> Optional[Tuple[str, str]]:
+    """(hostname, path) of a link or whitelist entry, or None if it has no usable host."""
+    url = url.rstrip('.,;:!?)]}\'"')  # punctuation around a link in a sentence
+    if '://' not in url:
+        url = '//' + url
+    try:
+        parts = urllib.parse.urlsplit(url)
+        host = parts.hostname
+    except ValueError:
+        return None
+    if not host:
+        return None
+    return host.rstrip('.'), parts.path
+
+
+class LinkWhitelist:
+    """Reversed-label suffix trie of whitelisted hosts, so "youtube.com" also allows "m.youtube.com"
+    but not "youtube.com.evil.net" or "evil.com/?x=youtube.com".
+
+    An entry with a path ("discord.gg/abc") only allows that path and what is below it.
+    """
+
+    ANY_PATH = 0  # non-string keys cannot collide with host labels
+    PATHS = 1
+
+    def __init__(self, entries=()):
+        self.root: Dict = {}
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry: str):
+        parts = split_link(entry.strip())
+        if parts is None:
+            return
+        host, path = parts
+        if host.startswith('www.'):
+            host = host[4:]
+        node = self.root
+        for label in reversed(host.split('.')):
+            node = node.setdefault(label, {})
+        path = path.rstrip('/').lower()
+        if path:
+            node.setdefault(self.PATHS, []).append(path)
+        else:
+            node[self.ANY_PATH] = True
+
+    def allows(self, url: str) -> bool:
+        parts = split_link(url)
+        if parts is None:
+            return False
+        host, path = parts
+        path = path.lower()
+        node = self.root
+        for label in reversed(host.split('.')):
+            node = node.get(label)
+            if node is None:
+                return False
+            if self.ANY_PATH in node:
+                return True
+            for prefix in node.get(self.PATHS, ()):
+                if path == prefix or path.startswith(prefix + '/'):
+                    return True
+        return False
+
+
+class EnforcementBatch:
+    """AutoMod actions collected for one channel between two flushes."""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.messages = []    # messages to bulk delete
+        self.timeouts = {}    # {user_id: (member, minutes)}
+        self.violations = {}  # {user_id: (member, {violation: count})}
+
+    def add(self, message, violation: str, timeout_minutes: Optional[int] = None):
+        member = message.author
+        if timeout_minutes is None:
+            self.messages.append(message)
+        else:
+            _, queued = self.timeouts.get(member.id, (member, 0))
+            self.timeouts[member.id] = (member, max(queued, timeout_minutes))
+        counts = self.violations.setdefault(member.id, (member, {}))[1]
+        counts[violation] = counts.get(violation, 0) + 1
+
+
+class AutoModConfig(NamedTuple):
+    """One guild's compiled AutoMod settings. Never mutated; a change builds and swaps in a new one."""
+
+    caps_threshold: float
+    spam_threshold: int
+    spam_interval: float
+    spam_timeout_minutes: int
+    duplicate_threshold: int
+    duplicate_window: float
+    shadow_mode: bool              # run the checks and record verdicts, but take no action
+    banned_words: frozenset        # the guild's own additions to the built-in list
+    link_whitelist: frozenset
+    banned_matcher: BannedWordMatcher
+    link_whitelist_trie: LinkWhitelist
+
+
 class AutoMod(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.spam_check = {}  
+        self.spam_windows: Dict[Tuple[int, int], deque] = {}  # {(guild_id, user_id): recent message times}
+        self.spam_sweep_interval = 60
+        self.spam_sweep_task = None
         self.caps_threshold = 0.7  
         self.spam_threshold = 5  
         self.spam_interval = 5  
         self.spam_timeout_minutes = 10  
+        self.duplicate_threshold = 4        # copies allowed across users/channels before the next one is removed
+        self.duplicate_window = 60          # seconds a fingerprint stays in the ring buffer
+        self.duplicate_buffer_size = 500    # fingerprints kept per guild
+        self.duplicate_min_tokens = 3       # shorter messages ("hi", "gg") are never fingerprinted
+        self.recent_fingerprints: Dict[int, MessageFingerprints] = {}
+        self.enforcement_interval = 0.5  # seconds violations in one channel are coalesced before acting
+        self.enforcement_queues: Dict[int, EnforcementBatch] = {}  # {channel_id: pending actions}
+        self.enforcement_workers: Dict[int, asyncio.Task] = {}
+        self.warning_cooldown = 10  # seconds, matches how long a warning stays up
+        self.last_warned: Dict[Tuple[int, int], float] = {}  # {(channel_id, user_id): monotonic time}
+        self.messages_seen = 0
+        self.messages_exempt = 0
+        self.check_stats: Dict[str, Dict[str, int]] = {}  # {check: calls, hits, total_ns, max_ns}
+        self.shadow_verdicts = deque(maxlen=200)  # (time, guild_id, channel_id, user_id, violation, content)
         self.link_whitelist = set()  
+        owner_id = os.getenv('BOT_OWNER_ID', '')
+        self.owner_id = int(owner_id) if owner_id.isdigit() else None
+        if self.owner_id is None:
+            print("AutoMod: BOT_OWNER_ID is not a numeric Discord ID, the owner is not exempt from link checks")
         self.banned_words = set()  
+        self.data_file = "automod_config.json"
+        self.guild_configs: Dict[int, Dict] = {}        # {guild_id: settings that differ from the defaults}
+        self.configs: Dict[int, AutoModConfig] = {}     # {guild_id: compiled snapshot}
+        self.default_config: Optional[AutoModConfig] = None
+        self.store = WriteBehindStore(self.data_file, self.snapshot_data)
         self.load_config()  
+        self.load_data()
         
 
     def load_config(self):
         
         self.banned_words = {
-        "nga", "btc",   
-        "hurensohn", "hure", "hurre", "hur3", "hur3ns0hn", "h.u.r.e", "h_u_r_e", 
-        "h-u-r-e", "h.u.r.e.n.s.o.h.n", "h_u_r_e_n_s_o_h_n", "h-u-r-e-n-s-o-h-n", 
-        "hur3n50hn", "huhrensohn", "hurns0hn", "hurenson", "hurens0hn", "huurensohn", 
-        "hureens0hn", "hur3nsohn", "hu-rensohn", "h***ensohn", "hurenzohn", 
-        "hurenzoon", "h.uhrensohn", "h@rensohn", "hu~~rensohn", "hurens0*h", 
-        "hurenson~", "hu-r3n50hn",
-        "schlampe", "schl4mp3", "schl4mpe", "schl.4.mp3", "schl_4_mp3", 
-        "schl-4-mp3", "schlamp@", "schlam.p3", "sch|ampe", "schla.mpe", 
-        "schl**ampe", "sch|4mp3", "sch~lampe", "schlamp3!", "schlampe-", 
-        "sch4mpe", "schl#mp3", "schlamp#", "s-chlampe", "sch|4mp3",
-        "fotze", "f0tz3", "f.o.t.z.e", "f_o_t_z_e", "f-o-t-z-e", "f0tz3nkn3cht", 
-        "fotz3", "f0t.z3", "fo_tz3", "f*tz3", "fötze", "fö.tze", "fot~ze", 
-        "f0~~tz3", "fo~tze", "fotz#", "fot_z3", "f0tz3n~knecht", 
-        "arschloch", "4rschl0ch", "arschl0ch", "4rschloch", "4r5chl0ch", 
-        "4r5chl0ch", "arsch|och", "ar-schloch", "arsch.loch", "ar.sch.l0ch", 
-        "arsch~loch", "arsch-l0ch", "arschl#ch", "ars~hloch", "arsc.hloch", 
-        "schwuchtel", "schwul", "schw.u.l", "schw_u_l", "schw-u-l", "schwuul", 
-        "schw~ul", "schwül", "schwu~~l", "sch~wuchtel", "schwu|chtel", "schwucht@l", 
-        "schw@ul", "sch~wul", "schwu|l", 
-        "nazi", "naz1", "n4z1", "n.a.z.i", "n_a_z_i", "n-a-z-i", "n4z1st", 
-        "na~~zi", "n~azi", "na!!zi", "na.z.i", "n-a~zi", "n4zi!", 
-        "heil", "h31l", "h.e.i.l", "h_e_i_l", "h-e-i-l", "h31l3r", 
-        "hitler", "h1tl3r", "hitl3r", "h1tler", "h1.tl3r", "h1_tl3r", 
-        "h|tl3r", "hi~tler", "h***ler", "h@tl3r", "hi!tler", 
-        "wichser", "w1chs3r", "w1chser", "wichs3r", "w1.chs3r", "w1_chs3r", 
-        "wi-chser", "w|chs3r", "wi~chser", "w!chser", "w*chs3r", "wi.chs3r", 
-        "spast", "sp4st", "sp.4.st", "sp_4_st", "sp-4-st", "sp4st1", 
-        "sp.ast", "sp~ast", "sp@st", "sp~~ast", "s-p4st", "sp**st", 
-        "kanake", "k4n4k3", "k4nake", "kan4ke", "k4n.4k3", "k4n_4k3", 
-        "ka.nake", "kan~ake", "kan@ke", "k@nake", "k4n4k3!", "ka**ke", 
-        "missgeburt", "m1ssgeburt", "missg3burt", "m1ssg3burt", "m1ssg3.burt", 
-        "mi~ssgeburt", "mis|geburt", "miss~geburt", "missg3b~urt", "m1ss-g3burt", 
-        "nutte", "n0tt3", "nutt3", "n0tte", "n.u.t.t.e", "n_u_t_t_e", 
-        "nut~te", "nutt@e", "n~utte", "nutte!", "nu~~tte", "nu.t.te", 
-        "fick", "f1ck", "f.i.c.k", "f_i_c_k", "f-i-c-k", "f1ck3n", 
-        "ficken", "f1ck3n", "f1cken", "fick3n", "f1.ck3n", "f1_ck3n", 
-        "fi~cken", "fick**", "fi~~ck3n", "fi*cken", 
-        "scheisse", "sch31ss3", "scheiss3", "sche1sse", "sch.31ss3", 
-        "sch~eisse", "sch#isse", "schei~~sse", "sch3iss3", "sche***sse", 
-        "fotzenknecht", "f0tz3nkn3cht", "fotz3nknecht", "f0tzenknecht", 
-        "fo~~tzenknecht", "fotzen~knecht", "fotzenk~~necht", "fo**knecht", 
-        "drecksau", "dr3cks4u", "drecks4u", "dr3cksau", "dr3.cks4u", 
-        "dreck~~sau", "dre~cksau", "drecks4u!", "dr3cks@u", 
-        "drecksfotze", "dr3cksf0tz3", "drecksf0tze", "dr3cksfotze", 
-        "dr~ecksfotze", "drecksf~otze", "dr3~cksfotze", 
-        "whore", "wh0re", "whoree", "whör", "wh0r3", "w.h.o.r.e", "w_h_o_r_e",
-        "wh0r3h0und", "wh0r3.h0und", "wh0r3_h0und", "wh0r3-h0und", 
-        "who.re", "wh*r3", "wh@re", "wh~ore", "whor3", "wh0r@", "wh***re", 
-        "wh.re", "who_r3", "who--re", "who~~re", "wh*r3h0und", "wh0_r3h0und",
-        "bitch", "b1tch", "b!tch", "b*tch", "b1tch3s", "b!tches", "b17ch", 
-        "b.i.t.c.h", "b_i_t_c_h", "b-i-t-c-h", "b1.t.ch", "b1_t_ch", 
-        "bitch3s", "b!tch3s", "b1**h", "b*tch3", "bi**h", "bi.t.ch", "b!t.ch",
-        "b*ches", "bitc#h", "bi7ch", "bi***h", "b_1tch", "b*t@ches", "b!7ch", 
-        "cunt", "kunt", "c*nt", "cxnt", "cvnt", "cuntz", "kuntz", "c0nt", 
-        "c.u.n.t", "c_u_n_t", "c-u-n-t", "c0.nt", "c0_nt", "c0-nt", 
-        "c.nt", "cu.nt", "k_nt", "kun.t", "cu~nt", "cun7", "c@n7", "k*nt", 
-        "slut", "sl*t", "sl4t", "slutz", "sl0t", "slvt", "sl_t", "s1ut", 
-        "s.l.u.t", "s_l_u_t", "s-l-u-t", "sl.ut", "sl_ut", "sl-ut", 
-        "s1ut", "sl~ut", "sl_tt", "s-l~ut", "slvvut", "sl@t", "s!ut", 
-        "faggot", "f4gg0t", "f4ggot", "fag", "f4g", "f@g", "f@gg0t", 
-        "f.a.g.g.o.t", "f_a_g_g_o_t", "f-a-g-g-o-t", "f4.gg0t", 
-        "f.g.g.o.t", "fa~~g", "f4got", "fa.ggot", "f*g", "fa@@t", "fa!got", 
-        "retard", "ret4rd", "r3t4rd", "r3tard", "r3t@rd", "ret@rd", 
-        "r.e.t.a.r.d", "r_e_t_a_r_d", "r-e-t-a-r-d", "r3.t4rd", 
-        "ret@rded", "r-tard", "re**rd", "re~tard", "r3tard", "r.t~rd", 
-        "pussy", "pussies", "p*ssy", "p*ss", "puss1", "p0ssy", "pvssy", 
-        "p.u.s.s.y", "p_u_s_s_y", "p-u-s-s-y", "p0.ssy", "p0_ssy", 
-        "pussycat", "p*ss!es", "p0ussy", "pu~~ssy", "pu$s", "pu.ssy", 
-        "dick", "d1ck", "d!ck", "d*ck", "d1ckhead", "dickhead", "d1ckh34d", 
-        "d.i.c.k", "d_i_c_k", "d-i-c-k", "d1.ck", "d1_ck", "d1-ck", 
-        "d1cky", "d!cks", "dickz", "di.ck", "dic~k", "di*c", "dic#k", 
-        "cock", "c0ck", "cxck", "c*ck", "c0cks", "c0ckz", "cocksucker", 
-        "c.o.c.k", "c_o_c_k", "c-o-c-k", "c0.ck", "c0_ck", "c0-ck", 
-        "cocks", "co~ck", "c**ks", "c0c*k", "cx*ck", "c@ck", "co~cks",
-        "s*upid", 
-        "penis", "p3n1s", "pen1s", "p3nis", "p3n!s", "pen!s", "p3n15", 
-        "p.e.n.i.s", "p_e_n_i_s", "p-e-n-i-s", "p3.n1s", "p3_n1s", 
-        "p.nis", "p3n@s", "pen*s", "p3~~nis", "p3ni$", "pe!nis", "pen!5", 
-        "WHORE", "BITCH", "CUNT", "SLUT", "FAGGOT", "RETARD", "PUSSY", 
-        "DICK", "COCK", "PENIS", "WH0RE", "B1TCH", "C*NT", "SL*UT", 
-        "F@GGOT", "RE**ARD", "P*SSY", "D!CK", "C*CK", "P3N1S",
-        "putain", "put1n", "put@in", "put@1n", "putaine", "put@ine", "put@1ne",
-        "p.u.t.a.i.n", "p_u_t_a_i_n", "p-u-t-a-i-n", "put.1n", "put_1n", 
-        "put*ain", "p!utain", "pu**ain", "p#tain", "p~utain", "pûtain", 
-        "putăin", "putäin", "pu&tain", "p.u.tain", "pu|tain", "p-u-t-4-i-n", 
-        "pu++ain", "put@!", "putin@", "put@ne", "pu7ain", "put@1n!", 
-        "salope", "sal0pe", "s@l0pe", "s@lope", "s@l0p3", "sal0p3", "s@lop3", 
-        "s.a.l.o.p.e", "s_a_l_o_p_e", "s-a-l-o-p-e", "s@l.0pe", "s@l_0pe", 
-        "sal*pe", "s!lope", "s@l0pe", "s4l0p3", "sälöpe", "sä|ope", "sal0p@", 
-        "sal~~ope", "sa|ope", "sa!!pe", "sa---lope", "s@lop@", "s@lo&pe", 
-        "connard", "c0nnard", "conn@rd", "c0nn@rd", "c0nn4rd", "c0nn@rd", 
-        "c.o.n.n.a.r.d", "c_o_n_n_a_r_d", "c-o-n-n-a-r-d", "c0nn.@rd", 
-        "con**ard", "conn@r!", "çonnard", "çønnard", "con~~nard", "co#nard", 
-        "conn|ard", "co--nnard", "con.n@rd", "cónnard", "cónnärd", "ç0nn4rd", 
-        "merde", "m3rd3", "m3rde", "m3rd3", "m@rd3", "m@rde", "m3rd@", 
-        "m.e.r.d.e", "m_e_r_d_e", "m-e-r-d-e", "m3.rd3", "m3_rd3", 
-        "me**de", "m3**d3", "me@rde", "mer.d3", "mer_d@", "mêrde", 
-        "mérde", "mërdè", "m~~erde", "mèrde", "mérd@", "m3r@de", 
-        "enculé", "encu1é", "encu1e", "encu*é", "encülé", "encul@", "encu1@", 
-        "en.c.u.l.é", "en_c_u_l_é", "en-cu-lé", "en-cu**é", "encu|é", 
-        "bâtard", "batard", "b4tard", "b@tard", "b4t@rd", "bätärd", "ba**ard", 
-        "bordel", "b0rd3l", "bord3l", "b0rd@l", "b0rdel", "bord*l", "bor~~del", 
-        "pute", "pu**e", "p@ute", "pu~te", "pu_te", "pu-t-e", "pu.te", 
-        "foutre", "f0utr3", "f@utre", "foutr@", "fout~re", "fo!tre", "foutr3", 
-        "p..utain", "s@l***pe", "c~onnard", "me!rd@", "fo~~utre", "bat~~ard", 
-        "enc~~ulé", "bo~~rdel", "pu**t@ine", "m3**rd3", "pu--t-ai-ne", 
-        "encul@d", "encu1-@", "c#onnard", "m€rde", "sa|op@", "putain*", 
-        "f**tre", "p.ut.in", "s_a_l.o_pe", "conn~ard", "m.rd@", "en_cu&lé", 
-        "pute", "putte", "poutain", "poutine", "pootain", "sallop", "salaupe", 
-        "merdre", "merrde", "merdd", "connars", "conart", "connar", 
-        "enculéé", "encule", "encûlé", "encoulé", "bâtars", "batards", "batar", 
-        "vazy", "vasi", "vasie", "va chier", "va te faire", "vaff", "fauteuil", 
-        "PUTAIN", "PUT@IN", "SALOPE", "CONNARD", "MERDE", "ENCULÉ", "BÂTARD", 
-        "BORDEL", "PUTE", "FOUTRE", "S@LOPE", "C*NNARD", "M3RDE", "ENCUL3", 
-        "EN_CU_LÉ", "BA**ARD", "FOU_TRE", "PU-TE", "ME-RDE", "VAFFANCULO",
-        "puttana", "putt4n4", "putt@n@", "putt@n4", "putt4n@", "putt4n4",
-        "p.u.t.t.a.n.a", "p_u_t_t_a_n_a", "p-u-t-t-a-n-a", "putt.4n4", 
-        "p*uttana", "p!uttana", "pu**tana", "p@uttana", "putta!na", "pu.t.t.a.n.a",
-        "put.tana", "putt_a_na", "p--u-t-t-a-n-a", "p~u~t~t~a~n~a", 
-        "puttan4", "pút.tànà", "pu##ana", "puttan@", "puʇʇanɐ",
-        "cazzo", "c4zz0", "c@zz0", "c@zzo", "c4zzo", "c@zz0", "c4zz0",
-        "c.a.z.z.o", "c_a_z_z_o", "c-a-z-z-o", "c4.zz0", "c4_zz0", 
-        "càzzò", "cäzzö", "c*zzo", "ca##o", "c@zzo!", "çazzo", 
-        "ca_zzo", "c-a.z.z-o", "c~azz0", "k4zz0", "căzzô", "ç@zz0",
-        "stronzo", "str0nz0", "str0nzo", "str0nz@", "str0nz4", "str0nz0",
-        "s.t.r.o.n.z.o", "s_t_r_o_n_z_o", "s-t-r-o-n-z-o", "str0.nz0", 
-        "stronz0", "str0n.z.o", "st-r-on-z-o", "str0n*z@", "s~tronzo", 
-        "strömzø", "st_ronz0", "s-t_r_o-n-z-o", "ştronzo", "str0nz#", 
-        "merda", "m3rd@", "m3rd4", "m.e.r.d.a", "m_e_r_d_a", "m-e-r-d-a", "m3rda",
-        "figa", "f1g@", "f1ga", "f.i.g.a", "f_i_g_a", "f-iga", "fig@", "fi**a",
-        "bastardo", "b4st@rd0", "b4stardo", "b.a.s.t.a.r.d.o", "b_a_s_t_a_r_d_o",
-        "vaffanculo", "v4ff4ncul0", "v@ff@nculo", "vaff@nculo", "vaffancul@", 
-        "pezzo di m3rd@", "pezzo_di_merda", "p.e.z.z.o.d.i.m.e.r.d.a", "pezzo.d.m.", 
-        "co****ne", "c0*****e", "co--gli**ne", "çoglione", "c-o-g-l-i-o-n-e", 
-        "zoccola", "z0ccol@", "z0ccola", "z.o.c.c.o.l.a", "z_o_c_c_o_l_a", 
-        "figliodiputtana", "figli0diputt4n@", "figli0_diputt@n@", 
-        "vaf*****ulo", "vaff@*********", "c****0 di m***a", 
-        "p._utt4n@", "c.4_zz0", "s_t**nzo", "me$$da", "fi@@a", "va~~fan~~culo", 
-        "str**nz@", "put&@n@", "fig.o~", "bas***do", "za!ccola", "pe##o", 
-        "vaff_~anculo", "c0gl!ion#", "c.o.g.l.-o.n.e", "pez*dimerda", 
-        "potana", "pottana", "puttna", "putna", "pzzo", "strunzo", "stronza", 
-        "strozno", "strozo", "bastard@", "merd@", "merdino", "vafan", "vafanc", 
-        "vafa!", "fanculo", "fan****lo", "fu***", "cul0", "culo!", "cul@", "kulo",
-        "figh@", "figha", "fi*ha", "f1gh@", "figh3", "ma****", "mannaggia", 
-        "mann@ggia", "mann***ia", "mannagg1a",
-        "Puttana", "PUTTANA", "PUTT4N4", "PUTT@n@", "PUTT@n4", "PUTT@N@", 
-        "CAZZO", "C4ZZO", "C@ZZO", "C.A.Z.Z.O", "C-A-Z-Z-O", "MERDA", "FIGA",
-        "STRONZO", "Vaffanculo", "COGLIONE", "ZOCCOLA", "BASTARDO", "CUL0",
-        "FAN****LO", "FI@HA", "POTANA", "VAFFA",
-        "馬鹿", "バカ", "死ね", "クソ", "カス", "ちんこ", "まんこ", "おっぱい",
-        "baka", "b4k4", "b@k@", "b@k4", "b4k@", "b@k@", "b4k4", "b@k4",
-        "b.a.k.a", "b_a_k_a", "b-a-k-a", "b4.k4", "b4_k4", "b4-k4",
-        "kuso", "kus0", "ku50", "kus@", "ku5@", "kus0", "ku50", "kus@",
-        "k.u.s.o", "k_u_s_o", "k-u-s-o", "kus.0", "kus_0", "kus-0",
-        "baka-san", "baka-chan", "baka-kun", "baka-sama", "baka desu", 
-        "baka da", "baka ne", "baka yo", "baka baka", "baka na", "baka janai",
-        "baka mitai", "baka sugiru", "baka deshou", "baka desho", 
-        "baka hontou", "baka shinde", "baka shine", "baka yarou", "baka mono",
-        "kusotare", "kusogaki", "kuso yarou", "kuso baka", "kuso shine",
-        "kuso janai", "kuso mitai", "kuso desu", "kuso da", "kuso yo",
-        "kuso kuso", "kuso mono", "kuso ne", "kuso sugiru", "kusottare",
-        "kuso baka shine", "kuso yarou shine", "kusoyarou baka",
-        "kusoyarou shine", "kusottare shine", "kusoyarou baka shine",
-        "baka kuso", "baka kusoyarou", "baka kusottare", "baka shine yo",
-        "baka kuso shine", "baka kusoyarou shine", "baka kusottare shine",
-        "chinko", "chinkokun", "chinkochan", "chinko shine", "chinko baka",
-        "chinko kuso", "chinko yarou", "chinko shine yo", "chinko shine ne",
-        "chinko sugiru", "chinko yarou baka", "chinko baka shine",
-        "manman", "manmanko", "mankosu", "mankoyarou", "manko shine",
-        "manko baka", "manko kuso", "manko yarou", "manko shine yo",
-        "manko shine ne", "manko sugiru", "manko yarou baka", "manko baka shine",
-        "manko kusoyarou", "manko kusottare", "oppai", "oppai yarou", 
-        "oppai baka", "oppai kuso", "oppai shine", "oppai baka shine", 
-        "oppai kusoyarou", "oppai kusottare", "oppai sugiru", 
-        "oppai yarou baka", "oppai baka shine", "oppai kusoyarou shine",
-        "shine", "shine yo", "shine ne", "shine baka", "shine kuso",
-        "shine yarou", "shine desu", "shine na", "shine mitai", 
-        "shine sugiru", "shine janai", "shine yarou baka", "shine baka kuso",
-        "shine kusoyarou", "shine kusottare", "shine baka shine",
-        "kusoyarou", "kusoyarou shine yo", "kusoyarou shine ne",
-        "kusoyarou shine baka", "kusoyarou shine kuso", "kusoyarou baka shine",
-        "kusottare shine", "kusottare shine yo", "kusottare shine ne",
-        "kusottare shine baka", "kusottare shine kuso", "kusottare baka shine",
-        "baka yarou shine", "baka yarou shine yo", "baka yarou shine ne",
-        "baka yarou shine baka", "baka yarou shine kuso", "baka yarou kuso shine",
-        "baka yarou kusoyarou", "baka yarou kusottare", "baka yarou baka shine",
-        "baka yarou kuso shine baka", "baka yarou kusoyarou shine",
-        "baka yarou kusottare shine", "baka yarou kuso baka shine",
-        "baka yarou kuso baka shine yo", "baka yarou kuso baka shine ne",
-        "baka yarou kuso baka shine sugiru", "baka yarou kuso baka shine desu",
-        "baka yarou kuso baka shine janai", "baka yarou kuso baka shine mitai",
-        "baka yarou kuso baka shine hontou",
-        "n1gg4", "n1gg3r", "n1663r", "n166a", "n1664", "nigg4", "nigg3r",
-        "n.i.g.g.4", "n_i_g_g_4", "n-i-g-g-4", "n1.gg4", "n1_gg4",
-        "f.u.c.k", "f_u_c_k", "f-u-c-k", "f.v.c.k", "f_v_c_k", "f-v-c-k",
-        "fvck", "phuck", "phvck", "fück", "fuck", "f*ck", "f**k", "fuk",
-        "fucc", "fukk", "fuking", "fucking", "fvcking", "phucking",
-        "motherfucker", "mothafucka", "muthafucka", "mtherfcker",
-        "mthrfckr", "motherfckr", "mothafckr", "mthafckr", "mtherfker",
-        "n1ggar", "n1gger", "niggah", "niggar", "niggur", "niggarz", "niggahz",
-        "nigga", "nigger", "btch", "bitch", "b1tch", "b1tchz", "b1tchaz",
-        "n1ggah", "niggaz", "n1ggaz", "nigguh", "n1gguh", "nigguz", "n1gguz",
-        "fukc", "fukkk", "fukkin", "fukker", "fukerz", "fukken", "fukingz",
-        "fuckz", "fuckinn", "fuckinnz", "fuckers", "fuckersz", "fuckar",
-        "fuckah", "fvckz", "fvcukk", "fvcukz", "fvckah", "fvckar", "fvckez",
-        "phuk", "phukk", "phucker", "phuckar", "phuckah", "phukerz",
-        "phucken", "phukking", "phukers", "fukz", "fukah", "fukkez", "fukers",
-        "motherfuck", "mthrfuck", "mtherfuk", "mtherfuckah", "mtherfuckar",
-        "mthafucka", "muthafukah", "mthrfkkr", "mtherfkerz", "motherfkkr",
-        "muthrfcker", "mthafker", "motherfkerz", "mtherfkkr", "mtherfukah",
-        "fukcinn", "fuckinnah", "fuckahzz", "fuckarzz", "fvcah", "fvcar",
-        "fvcuck", "fvckahz", "fukinnzz", "phuckinn", "phukin", "phuckk",
-        "phukinzz", "phuckkk", "phuckerzz", "phukingg", "mothafker", "mthafkr",
-        "muthafkr", "mthrfck", "mothrfckr", "mthafcker", "mthrfkerz",
-        "motherfkrz", "mthrfuckk", "mtherfukker", "mthrfukkerz", "motherfker",
-        "mtherfkrz", "mthafukker", "mthrfker", "mthrfkrr", "motherfukkerz",
-        "fuckinnn", "fukcinnn", "fukkerz", "fukinnzz", "fvckinn", "fvckinnz",
-        "phuckah", "phuckahz", "fvcker", "fvckerz", "phukahz", "phukinzz",
-        "phuckeninn", "phuckerinn", "phukerszz", "fukking", "fuckinggg",
-        "fuckkinnz", "fuckinz", "fuckennz", "fvcukinnz", "fukahnn", "fvcahz",
-        "fvcahh", "fvckarh", "fukkerinn", "fuckkerinn", "fuckennn", "fukennz",
-        "fvcukinn", "fvcukkinn", "phvcukk", "phvcukkah", "fvckinnnn",
-        "fvckennnn", "fvckennz", "phukenn", "phuckeninnzz", "fukcah", "phukah",
-        "fukinnnzz", "fuckarrr", "fvckarrr", "phuckarrr", "phukenarrr",
-        "phukckk", "phvckk", "fvckarzz", "fuckarz", "fuckinnzzz", "fvckinnz",
-        "phukz", "fukkzzz", "fukkahz", "phukkahzz", "mtherfkr", "mtherfkkr",
-        "mthrfkkrz", "mthrfkrz", "mthrfkkrr", "mthrfuckkrr", "mtherfkkrr",
-        "motherfkkrr", "motherfkrr", "motherfuckahrr", "motherfkkrz",
-        "mthrfukkrz", "mthrfuckarrr", "mthrfkerinn", "motherfkerinn",
-        "motherfuckerinn", "mthrfkerah", "mtherfukkerzz", "motherfukkerinnzz",
-        "mthrfkerahzz", "fukkz", "fuckkz", "fvckzz", "fvckahzz", "phvcah",
-        "phvcukz", "fvcckzz", "fvcckah", "fukkkah", "phukahzz", "phvcukah",
-        "phvcukahzz", "phukckkzz", "phvcukenn", "fukenn", "fuckkinnzz", 
-        "fvckennzz", "phuckar", "phuckarrrzz", "fukinnnnz", "fvckinnnnz", 
-        "phuckinnzz", "phuckerinnzz", "fvccahnn", "fvccahh", "fvccukzz",
-        "fvccennzz", "fvccenn", "fvccukennzz", "fvccahz", "phuckennzz",
-        "fvccahnnzz", "fukahz", "phukahh", "phvcukahh", "fvccahinnzz", 
-        "fvccahkk", "phuckkkinn", "phvcukinn", "phvcukinnzz", "fvccukahh", 
-        "fvcckerzz", "fvcckerinnzz", "phvcahzz", "fvccennnnz",
-        "kys", "k y s", "k.y.s", "k_y_s", "k-y-s", "k.y.s.", "k_y_s_",
-        "kill yourself", "k1ll y0urs3lf", "k!ll y0urs3lf", "k1ll y0urs3lf",
-        "k.i.l.l.y.o.u.r.s.e.l.f", "k_i_l_l_y_o_u_r_s_e_l_f",
-        "suicide", "su1c1d3", "su1c1de", "suic1de", "su1cide", "su!c!de",
-        "s.u.i.c.i.d.e", "s_u_i_c_i_d_e", "s-u-i-c-i-d-e", "su1.c1d3",
-        "self harm", "s3lf h4rm", "s3lf.h4rm", "s3lf_h4rm", "s3lf-h4rm",
-        "s.e.l.f.h.a.r.m", "s_e_l_f_h_a_r_m", "s-e-l-f-h-a-r-m",
-        "kys now", "kys immediately", "kys today", "kys please", "kys fast",
-        "kill_urself", "kill_ur_self", "kill-yourself-now", "kill yourself fast",
-        "kill yourself today", "just kill yourself", "why not kys", "go kys now",
-        "you should kys", "how to kys", "kys tutorial", "suicide now", 
-        "do suicide", "go do suicide", "commit suicide", "suicide guide",
-        "suicide fast", "suicide quickly", "suicide tonight", "suicide tomorrow",
-        "suicide for sure", "s u i c i d e", "sui cide", "suicide plans",
-        "plan suicide", "suicide instructions", "suicide advice",
-        "suicide methods", "suicide help", "how to self harm", 
-        "self_harm_now", "self harm tutorial", "commit self harm", 
-        "self harm guide", "self harm plan", "start self harm", 
-        "self harm immediately", "self harm today", "self harm please",
-        "self harm now", "you should self harm", "just self harm", 
-        "self harm instructions", "self harm advice", "self harm tips",
-        "how to commit self harm", "self_harm_tutorial", "self harm tonight",
-        "go self harm", "self harm methods", "self harm fast", 
-        "self_harm_quickly", "self harm quickly", "commit_self_harm",
-        "self harm tomorrow", "self harm suggestions", "ways to self harm",
-        "steps to self harm", "suicide plans now", "self harm guide online",
-        "why not suicide", "learn suicide", "find suicide tips",
-        "kill your self", "kill yourself today", "kill yourself tips",
-        "kys easily", "kys guide", "how to kys quickly", 
-        "kys suggestions", "kys steps", "how to kys instructions",
-        "kys easily today", "kys methods online", "kys safely",
-        "self harm safely", "self harm today fast", "commit self harm tonight",
-        "self harm immediately tips", "suicide now guide", 
-        "suicide fast steps", "commit suicide tomorrow", 
-        "do suicide plans", "just suicide", "you should suicide now",
-        "go and suicide", "kys faster", "kys slower", "kill your self today",
-        "suicide now tutorial", "suicide now advice", "why suicide is good",
-        "how suicide works", "self harm is okay", "start self harming now",
-        "self_harm_help", "self harm techniques", "self harm advice online",
-        "kys instructions online", "suicide tips fast", "suicide now tutorial",
-        "commit self harm tutorial", "start_kys", "kys help", "kys now please",
-        "suicide please", "help me suicide", "suicide suggestions",
-        "kys planning", "kys execution", "suicide execution", "suicide tonight",
-        "commit_suicide_fast", "plan your suicide", "how to kys properly",
-        "suicide guide instructions", "how to commit_self_harm",
-        "self harm advice safely", "how to end it all", "end your life now",
-        "suicide today", "learn how to kys", "you should kys now",
-        "kys_step_by_step", "ways to end it", "self_harm_online",
-        "go harm yourself", "just go kys", "suicide plans fast",
-        "commit_suicide_instructions", "kill_your_self_guide", "end it tutorial",
-        "self harm method", "method for self harm", "suicide execution guide",
-        "suicide execution tips", "suicide execution methods",
-        "kys_today", "kill_your_self_fast", "suicide fast tonight",
-        "self harm tonight plans", "commit self harm fast guide",
-        "suicide tomorrow plans", "harm yourself safely", 
-        "harm yourself guide", "harm yourself tips", 
-        "harm yourself methods", "harm yourself fast", 
-        "harm yourself now tutorial", "how to harm yourself easily", 
-        "suicide step guide", "suicide instruction plans", 
-        "suicide_tips", "suicide safely guide", "self harm safely tips",
-        "harm yourself now", "why harm yourself", "why not self harm",
-        "harm yourself techniques", "harm yourself execution",
-        "harm yourself tools", "tools for suicide", "tools for harm",
-        "suicide techniques safely", "harm yourself fast online", 
-        "tools for self harm", "harm yourself instructions", 
-        "commit_harm", "commit_self_harm_steps", "suicide safely tutorial",
-        "free nitro", "fr33 n1tr0", "free.nitro", "fr33.n1tr0", "fr33_n1tr0",
-        "f.r.e.e.n.i.t.r.o", "f_r_e_e_n_i_t_r_o", "f-r-e-e-n-i-t-r-o",
-        "steam gift", "st34m g1ft", "steam.gift", "st34m.g1ft", "st34m_g1ft",
-        "s.t.e.a.m.g.i.f.t", "s_t_e_a_m_g_i_f_t", "s-t-e-a-m-g-i-f-t",
-        "robux generator", "r0bux g3n3r4t0r", "robux.generator",
-        "r.o.b.u.x.g.e.n.e.r.a.t.o.r", "r_o_b_u_x_2_g_e_n_e_r_a_t_o_r",
-        "free_nitro_code", "free nitro giveaway", "free nitro bot",
-        "get free nitro", "nitro giveaway free", "free nitro now",
-        "steam_gift_card", "steam gift codes", "steam_gift_now",
-        "free_steam_gift", "robux free generator", "robux gift generator",
-        "robux free codes", "robux generator free", "robux generator online",
-        "free_nitro_code_2023", "free_nitro_generator", "nitro free discord",
-        "free discord nitro", "nitro discount free", "discord gift nitro",
-        "steam_discount_gift", "steam freebie gift", "free_robux_now",
-        "robux free access", "robux generator new", "robux generator giveaway",
-        "robux hack generator", "free_robux_bot", "discord_free_gift",
-        "discord_nitro_bot", "get_free_robux", "robux_online_tool",
-        "discord_code_generator", "discord_nitro_free", "steam_gift_online",
-        "steam_card_gift", "steam_card_discount", "robux_hack_tool",
-        "robux_promo_codes", "robux_gift_online", "robux_tool_generator",
-        "free_gift_online", "discord_promo_bot", "steam_promo_codes",
-        "steam_code_hack", "free_steam_codes", "robux_promo_tool",
-        "robux_access_generator", "get_steam_card", "free_gift_steam",
-        "nitro_giveaway_bot", "discord_promo_code", "free_bot_gift",
-        "nitro_code_promo", "steam_bot_codes", "nitro_hack_tool",
-        "get_promo_nitro", "steam_gift_key", "steam_gift_discount",
-        "robux_key_generator", "free_promo_code", "discord_tool_bot",
-        "free_nitro_access", "robux_key_hack", "promo_code_generator",
-        "free_steam_access", "gift_code_online", "nitro_online_tool",
-        "steam_access_gift", "robux_online_access", "nitro_bot_generator",
-        "get_robux_now", "free_promo_generator", "robux_gift_discount",
-        "robux_promo_key", "robux_gift_code", "nitro_card_promo",
-        "steam_online_gift", "free_steam_discount", "gift_bot_robux",
-        "robux_bot_tool", "discord_promo_codes", "steam_gift_code_now",
-        "robux_card_tool", "promo_tool_robux", "steam_gift_bot",
-        "robux_tool_now", "robux_online_bot", "robux_gift_tool",
-        "steam_code_promo", "free_key_nitro", "free_robux_code",
-        "discord_hack_gift", "robux_tool_card", "promo_tool_discount",
-        "nitro_discount_tool", "robux_hack_codes", "steam_discount_code",
-        "free_gift_tool", "robux_code_tool", "discord_card_generator",
-        "free_tool_gift", "robux_key_discount", "robux_discount_bot",
-        "free_tool_card", "steam_key_promo", "nitro_tool_bot",
-        "nitro_gift_codes", "steam_key_generator", "free_promo_gift",
-        "free_bot_promo", "gift_card_online", "robux_access_promo",
-        "free_key_discount", "free_key_tool", "nitro_promo_discount",
-        "nitro_gift_online", "nitro_key_codes", "robux_discount_tool",
-        "steam_bot_gift", "nitro_discount_bot", "steam_promo_tool",
-        "discord_promo_generator", "nitro_bot_key", "robux_card_promo",
-        "steam_tool_discount", "robux_discount_codes", "nitro_key_online",
-        "steam_card_key", "promo_gift_code", "gift_tool_online",
-        "gift_key_promo", "nitro_online_access", "steam_discount_bot",
-        "nitro_giveaway_tool", "promo_access_bot", "robux_code_promo",
-        "gift_code_promo", "free_nitro_promo", "gift_access_tool",
-        "free_nitro_key", "nitro_card_codes", "free_access_tool",
-        "steam_giveaway_bot", "promo_code_bot", "robux_promo_bot",
-        "promo_card_tool", "free_access_promo", "steam_access_code",
-        "free_gift_key", "promo_discount_tool", "promo_discount_bot",
-        "promo_key_bot", "promo_key_tool", "promo_gift_tool",
-        "discount_gift_bot", "promo_bot_discount", "promo_access_tool",
-        "gift_card_promo", "nitro_gift_discount", "free_discount_code",
-        "discord_promo_gift", "promo_code_discount", "promo_key_code",
-        "discount_bot_key", "discount_tool_code", "promo_bot_card",
-        "promo_key_promo", "discount_key_promo", "gift_card_access",
-        "promo_code_online", "gift_key_online", "promo_code_access",
-        "promo_access_code", "discount_bot_tool", "promo_code_card",
-        "promo_discount_card", "gift_discount_tool", "promo_card_key",
-        "promo_key_access", "discount_access_bot", "promo_discount_access",
-        "promo_code_key", "promo_discount_key", "promo_key_online",
-        "gift_key_card", "discount_promo_bot", "promo_giveaway_card",
-        "promo_bot_online", "gift_tool_discount", "discount_giveaway_tool",
-        "promo_code_giveaway", "promo_tool_access", "promo_key_discount",
-        "discount_card_tool", "gift_bot_discount", "promo_key_gift",
-        "discount_key_gift", "promo_gift_access", "promo_card_access",
-        "promo_discount_gift", "promo_giveaway_access", "promo_key_tool",
-        "discount_gift_access", "promo_tool_key", "promo_card_discount",
-        "promo_discount_code", "promo_card_tool", "discount_card_key",
-        "promo_key_generator", "promo_tool_online", "promo_tool_gift",
-        "promo_discount_bot", "promo_gift_code", "discount_key_tool",
-        "promo_access_card", "promo_tool_discount", "promo_bot_access",
-        "promo_discount_tool", "promo_key_tool", "promo_discount_access",
-        "promo_code_tool", "promo_card_key", "promo_key_online",
-        "promo_tool_card", "promo_discount_key", "promo_access_tool",
-        "🖕", "promo",
+            # Canonical roots only: normalize_text() folds case, accents, look-alike letters,
+            # leetspeak and separators, and the matcher folds repeated letters, so spellings
+            # like "h.u.r.e", "hur3ns0hn" or "schl4mp3" no longer need their own entries.
+            # German
+            "arschloch", "hure", "huhrensohn", "hurnsohn", "harensohn", "schlamp", "fotz", "fick",
+            "wichser", "missgeburt", "schwuchtel", "schwul", "scheisse", "spast", "kanake",
+            "nutte", "drecksau", "hitler", "heil", "nazi",
+            # English
+            "fuck", "fvck", "fvcuk", "fvcuck", "fvcah", "fvcar", "fuk", "fucc", "motherf",
+            "mothaf", "mothrf", "mtherf", "mthrf", "mthaf", "muthaf", "muthrf", "fvcen", "phuck",
+            "phuk", "phvck", "phvcuk", "phvcah", "cunt", "cvnt", "cxnt", "kunt", "cock", "cxck",
+            "dick", "bitch", "slut", "slvt", "slvvut", "whor", "pussy", "pussies", "pvssy",
+            "penis", "fag", "retard", "nigger", "nigga", "nigguh", "niggur", "nigguz", "nga",
+            "btc", "possy",
+            # Self-harm
+            "kys", "k y s", "kill yourself", "kill your self", "killyourself", "killurself",
+            "suicide", "sui cide", "s u i c i d e", "self harm", "selfharm", "commitharm",
+            "harm yourself", "tools for harm", "end your life now", "how to end it all",
+            "ways to end it", "end it tutorial",
+            # French
+            "putain", "poutain", "pootain", "pute", "putna", "salope", "salaupe", "sallop",
+            "encul", "connard", "conard", "connar", "conart", "merd", "foutre", "bordel", "batar",
+            "va te faire", "va chier", "vazy", "poutine", "fauteuil",
+            # Italian
+            "cazzo", "kazzo", "stronz", "strozo", "strozno", "strunzo", "puttana", "potana",
+            "puʇʇanɐ", "coglione", "vaff", "vafan", "zoccola", "fanculo", "mannaggia", "figa",
+            "figha", "kulo", "bastard", "pzzo", "vasi",
+            # Japanese
+            "baka", "kuso", "chinko", "oppai", "manko", "manman", "shine", "おっぱい", "ちんこ", "まんこ",
+            "カス", "クソ", "バカ", "死ね", "馬鹿", "🖕",
+            # Scam bait
+            "promo", "free nitro", "freenitro", "get free nitro", "discord gift nitro",
+            "free discord nitro", "nitro free discord", "nitro discount free",
+            "nitro giveaway free", "steam gift", "steamgift", "steam freebie gift",
+            "robux generator", "robuxgenerator", "robux2generator", "robux gift generator",
+            "robux hack generator", "robux free", "discord_card_generator",
+            "discord_code_generator", "discord_free_gift", "discord_hack_gift",
+            "discord_nitro_bot", "discord_nitro_free", "discord_tool_bot", "discount_access_bot",
+            "discount_bot_key", "discount_bot_tool", "discount_card_key", "discount_card_tool",
+            "discount_gift_access", "discount_gift_bot", "discount_giveaway_tool",
+            "discount_key_gift", "discount_key_tool", "discount_tool_code", "free_access_tool",
+            "free_bot_gift", "free_discount_code", "free_gift_key", "free_gift_online",
+            "free_gift_steam", "free_gift_tool", "free_key_discount", "free_key_nitro",
+            "free_key_tool", "free_robux_bot", "free_robux_code", "free_robux_now",
+            "free_steam_access", "free_steam_codes", "free_steam_discount", "free_tool_card",
+            "free_tool_gift", "get_free_robux", "get_robux_now", "get_steam_card",
+            "gift_access_tool", "gift_bot_discount", "gift_bot_robux", "gift_card_access",
+            "gift_card_online", "gift_code_online", "gift_discount_tool", "gift_key_card",
+            "gift_key_online", "gift_tool_discount", "gift_tool_online", "nitro_bot_generator",
+            "nitro_bot_key", "nitro_card_codes", "nitro_discount_bot", "nitro_discount_tool",
+            "nitro_gift_codes", "nitro_gift_discount", "nitro_gift_online", "nitro_giveaway_bot",
+            "nitro_giveaway_tool", "nitro_hack_tool", "nitro_key_codes", "nitro_key_online",
+            "nitro_online_access", "nitro_online_tool", "nitro_tool_bot", "robux_access_generator",
+            "robux_bot_tool", "robux_card_tool", "robux_code_tool", "robux_discount_bot",
+            "robux_discount_codes", "robux_discount_tool", "robux_gift_code",
+            "robux_gift_discount", "robux_gift_online", "robux_gift_tool", "robux_hack_codes",
+            "robux_hack_tool", "robux_key_discount", "robux_key_generator", "robux_key_hack",
+            "robux_online_access", "robux_online_bot", "robux_online_tool", "robux_tool_card",
+            "robux_tool_generator", "robux_tool_now", "steam_access_code", "steam_access_gift",
+            "steam_bot_codes", "steam_bot_gift", "steam_card_discount", "steam_card_gift",
+            "steam_card_key", "steam_code_hack", "steam_discount_bot", "steam_discount_code",
+            "steam_discount_gift", "steam_giveaway_bot", "steam_key_generator",
+            "steam_online_gift", "steam_tool_discount",
         }
-        
-    
-    async def check_banned_words(self, message):
-        """Check for banned words, including bypassed versions."""
-        content = message.content.lower()
-        for word, pattern in self.banned_regex.items():
-            if pattern.search(content):
-                await message.delete()
-                await self.send_warning(message.channel, message.author, "banned_words")
-                return True
-        return False
-        
+        # Bypass spellings that no reading of a root above reaches; matched glyph for glyph.
+        self.banned_variants = {
+            "cul0", "cul@", "culo!", "fi@ha", "fi@@a", "figh3", "fa@@t", "b*t@ches", "di*c", "p*ss",
+            "pu$s", "puss1", "s*upid", "ma****", "c****0 di m***a", "encoulé", "fo!tre", "m3r@de",
+            "s!lope", "sa!!pe", "put1n", "putin@", "pe##o", "pezzo.d.m.", "me$$da", "mis|geburt",
+            "sch4mpe", "sl4t", "strömzø", "vafa!", "za!ccola",
+        }
+        self.default_config = self.compile_config({})
+
+    def load_data(self):
+        """Load the per-guild AutoMod settings and compile a snapshot for each guild."""
+        if not os.path.exists(self.data_file):
+            return
+        try:
+            with open(self.data_file, 'r') as f:
+                data = json.load(f)
+        except json.JSONDecodeError:
+            print(f"Failed to decode {self.data_file}, using the default AutoMod settings.")
+            return
+        self.guild_configs = {int(guild_id): raw for guild_id, raw in data.get('guilds', {}).items()}
+        self.configs = {guild_id: self.compile_config(raw) for guild_id, raw in self.guild_configs.items()}
+
+    def snapshot_data(self):
+        return {'guilds': {str(guild_id): raw for guild_id, raw in self.guild_configs.items()}}
+
+    def compile_config(self, raw: Dict) -> AutoModConfig:
+        """Build the matcher, whitelist trie and thresholds for one guild's settings."""
+        banned_words = frozenset(word.lower() for word in raw.get('banned_words', ()))
+        link_whitelist = frozenset(entry.lower() for entry in raw.get('link_whitelist', self.link_whitelist))
+        if self.default_config is not None and not banned_words:
+            banned_matcher = self.default_config.banned_matcher  # nothing added, share the built-in automaton
+        else:
+            banned_matcher = BannedWordMatcher(self.banned_words | banned_words, self.banned_variants)
+        return AutoModConfig(
+            caps_threshold=float(raw.get('caps_threshold', self.caps_threshold)),
+            spam_threshold=int(raw.get('spam_threshold', self.spam_threshold)),
+            spam_interval=float(raw.get('spam_interval', self.spam_interval)),
+            spam_timeout_minutes=int(raw.get('spam_timeout_minutes', self.spam_timeout_minutes)),
+            duplicate_threshold=int(raw.get('duplicate_threshold', self.duplicate_threshold)),
+            duplicate_window=float(raw.get('duplicate_window', self.duplicate_window)),
+            shadow_mode=bool(raw.get('shadow_mode', False)),
+            banned_words=banned_words,
+            link_whitelist=link_whitelist,
+            banned_matcher=banned_matcher,
+            link_whitelist_trie=LinkWhitelist(link_whitelist),
+        )
+
+    def config_for(self, guild_id: int) -> AutoModConfig:
+        return self.configs.get(guild_id, self.default_config)
+
+    async def update_guild_config(self, guild_id: int, changes: Dict):
+        """Apply changes to a guild's settings, swap in a freshly compiled snapshot and persist it."""
+        raw = dict(self.guild_configs.get(guild_id, {}))
+        raw.update(changes)
+        config = self.compile_config(raw)
+        self.guild_configs[guild_id] = raw
+        self.configs[guild_id] = config
+        self.store.mark_dirty(guild_id)
+        await self.store.flush()
+
+    def export_guild_config(self, guild_id: int) -> Dict:
+        config = self.config_for(guild_id)
+        return {
+            "caps_threshold": config.caps_threshold,
+            "spam_threshold": config.spam_threshold,
+            "spam_interval": config.spam_interval,
+            "spam_timeout_minutes": config.spam_timeout_minutes,
+            "duplicate_threshold": config.duplicate_threshold,
+            "duplicate_window": config.duplicate_window,
+            "shadow_mode": config.shadow_mode,
+            "banned_words": sorted(config.banned_words),
+            "link_whitelist": sorted(config.link_whitelist)
+        }
+
+    async def cog_load(self):
+        self.spam_sweep_task = asyncio.create_task(self.sweep_spam_windows())
+
+    async def cog_unload(self):
+        if self.spam_sweep_task:
+            self.spam_sweep_task.cancel()
+        for task in self.enforcement_workers.values():
+            task.cancel()
+        await self.store.close()
+
+    async def sweep_spam_windows(self):
+        """Drop spam windows with no message in the last interval, so memory tracks active users only."""
+        while True:
+            await asyncio.sleep(self.spam_sweep_interval)
+            now = time.monotonic()
+            self.spam_windows = {
+                key: window for key, window in self.spam_windows.items()
+                if window and window[-1] > now - self.config_for(key[0]).spam_interval
+            }
+            self.recent_fingerprints = {
+                guild_id: fingerprints for guild_id, fingerprints in self.recent_fingerprints.items()
+                if fingerprints.prune(now)
+            }
+            self.last_warned = {
+                key: warned_at for key, warned_at in self.last_warned.items()
+                if warned_at > now - self.warning_cooldown
+            }
+
     @commands.Cog.listener()
     async def on_message(self, message):
         if message.author.bot or isinstance(message.channel, discord.DMChannel):
@@ -5835,99 +7753,199 @@ class AutoMod(commands.Cog):
 
         await self.check_message(message)
 
-    async def check_message(self, message):
-        checks = [
-            self.check_spam,
-            self.check_caps,
-            self.check_links,
-            self.check_banned_words
-        ]
+    async def check_message(self, message) -> Optional[str]:
+        """Scan a message and act on the violation it raised, or only record it in shadow mode."""
+        config = self.config_for(message.guild.id)
+        violation = self.scan_message(message, config)
+        if not violation:
+            return None
+        if config.shadow_mode:
+            self.shadow_verdicts.append((
+                datetime.now(), message.guild.id, message.channel.id, message.author.id, violation, message.content[:100].replace('`', "'")
+            ))
+        else:
+            self.enforce(message, violation, config)
+        return violation
 
-        for check in checks:
-            action = await check(message)
-            if action:
-                return
+    def is_exempt(self, member) -> bool:
+        return member.id == self.owner_id or member.guild_permissions.manage_messages
 
-    async def check_spam(self, message):
-        
-        author_id = message.author.id
-        current_time = time.time()
+    def scan_message(self, message, config: AutoModConfig) -> Optional[str]:
+        """Run the checks cheapest first without awaiting and return the first violation, if any."""
+        self.messages_seen += 1
+        if self.is_exempt(message.author):
+            self.messages_exempt += 1
+            return None
 
-        if author_id not in self.spam_check:
-            self.spam_check[author_id] = {"messages": 1, "last_message": current_time}
-            return False
+        if self.run_check("spam", self.check_spam, message, config):
+            return "spam"
+
+        content = message.content
+        if not content:
+            return None  # attachments only, nothing left to inspect
+
+        if len(content) >= 8 and not content.islower():  # lower-case text can never trip the caps ratio
+            if self.run_check("caps", self.check_caps, content, config):
+                return "caps"
+
+        if '/' in content:  # both URL_PATTERN forms need a slash
+            if self.run_check("links", self.check_links, content, config):
+                return "links"
+
+        start = time.perf_counter_ns()
+        folded = fold_text(content)
+        text = folded.translate(NORMALIZE_TABLE)
+        self.record_check("normalize", time.perf_counter_ns() - start, False)
+
+        if self.run_check("banned_words", self.check_banned_words, message, text, folded, config):
+            return "banned_words"
+
+        if self.run_check("duplicate", self.check_duplicates, message, text, config):
+            return "duplicate"
+        return None
+
+    def run_check(self, name: str, check, *args) -> bool:
+        start = time.perf_counter_ns()
+        hit = check(*args)
+        self.record_check(name, time.perf_counter_ns() - start, hit)
+        return hit
+
+    def record_check(self, name: str, elapsed_ns: int, hit: bool):
+        stats = self.check_stats.get(name)
+        if stats is None:
+            stats = self.check_stats[name] = {"calls": 0, "hits": 0, "total_ns": 0, "max_ns": 0}
+        stats["calls"] += 1
+        stats["total_ns"] += elapsed_ns
+        if elapsed_ns > stats["max_ns"]:
+            stats["max_ns"] = elapsed_ns
+        if hit:
+            stats["hits"] += 1
+
+    def enforce(self, message, violation: str, config: AutoModConfig):
+        """Queue the action on the channel's batch; the channel worker carries it out on the next flush."""
+        channel_id = message.channel.id
+        batch = self.enforcement_queues.get(channel_id)
+        if batch is None:
+            batch = self.enforcement_queues[channel_id] = EnforcementBatch(message.channel)
+        batch.add(message, violation, config.spam_timeout_minutes if violation == "spam" else None)
+        worker = self.enforcement_workers.get(channel_id)
+        if worker is None or worker.done():
+            self.enforcement_workers[channel_id] = self.bot.loop.create_task(self.flush_enforcement(channel_id))
+
+    async def flush_enforcement(self, channel_id: int):
+        """Wait out the coalescing window, then bulk delete, time out and warn each user once."""
+        await asyncio.sleep(self.enforcement_interval)
+        batch = self.enforcement_queues.pop(channel_id, None)
+        self.enforcement_workers.pop(channel_id, None)
+        if batch is None:
+            return
+        channel = batch.channel
 
-        if current_time - self.spam_check[author_id]["last_message"] > 5:
-            self.spam_check[author_id] = {"messages": 1, "last_message": current_time}
-            return False
+        for i in range(0, len(batch.messages), 100):  # bulk delete takes at most 100 messages per request
+            chunk = batch.messages[i:i + 100]
+            try:
+                await channel.delete_messages(chunk)
+            except (discord.Forbidden, discord.NotFound, discord.HTTPException) as e:
+                print(f"AutoMod could not delete {len(chunk)} messages in {channel}: {e}")
 
-        self.spam_check[author_id]["messages"] += 1
-        
-        if self.spam_check[author_id]["messages"] >= 5:
-            await message.author.timeout(timedelta(minutes=(self.spam_timeout_minutes)), reason="Spam detection")
-            await self.send_warning(message.channel, message.author, "spam")
+        for member, minutes in batch.timeouts.values():
+            try:
+                await member.timeout(timedelta(minutes=minutes), reason="Spam detection")
+            except (discord.Forbidden, discord.NotFound, discord.HTTPException) as e:
+                print(f"AutoMod could not time out {member}: {e}")
+
+        now = time.monotonic()
+        for user_id, (member, counts) in batch.violations.items():
+            key = (channel_id, user_id)
+            if now - self.last_warned.get(key, float('-inf')) < self.warning_cooldown:
+                continue  # their last warning is still on screen
+            self.last_warned[key] = now
+            try:
+                await self.send_warning(channel, member, counts)
+            except (discord.Forbidden, discord.HTTPException) as e:
+                print(f"AutoMod could not warn {member} in {channel}: {e}")
+
+    def check_spam(self, message, config: AutoModConfig) -> bool:
+        """Sliding window: spam_threshold messages within spam_interval seconds, per guild and user."""
+        key = (message.guild.id, message.author.id)
+        now = time.monotonic()
+
+        window = self.spam_windows.get(key)
+        if window is None:
+            window = self.spam_windows[key] = deque()
+        cutoff = now - config.spam_interval
+        while window and window[0] <= cutoff:
+            window.popleft()
+        window.append(now)
+
+        if len(window) >= config.spam_threshold:
+            window.clear()
             return True
-
-        self.spam_check[author_id]["last_message"] = current_time
         return False
 
-    async def check_caps(self, message):
-        if len(message.content) < 8:
+    def check_duplicates(self, message, text: str, config: AutoModConfig) -> bool:
+        """Flag the same or lightly varied text posted more than duplicate_threshold times across users or channels."""
+        if len(text.split()) < self.duplicate_min_tokens:
             return False
 
-        caps_ratio = sum(1 for c in message.content if c.isupper()) / len(message.content)
-        if caps_ratio > self.caps_threshold:
-            await message.delete()
-            await self.send_warning(message.channel, message.author, "caps")
-            return True
-        return False
-
-    async def check_links(self, message):
-    
-        BOT_OWNER_ID = os.getenv('BOT_OWNER_ID')
+        fingerprints = self.recent_fingerprints.get(message.guild.id)
+        if fingerprints is None:
+            fingerprints = self.recent_fingerprints[message.guild.id] = MessageFingerprints(
+                config.duplicate_window, self.duplicate_buffer_size
+            )
+        fingerprints.window = config.duplicate_window  # follows automodset without rebuilding the buffer
+        matches = fingerprints.add(
+            hash(text), minhash(message_shingles(text)), time.monotonic(), message.author.id, message.channel.id,
+            config.duplicate_threshold
+        )
+        if len(matches) < config.duplicate_threshold:
+            return False
 
-        if not BOT_OWNER_ID or not BOT_OWNER_ID.isdigit():
-            raise ValueError("Invalid BOT_OWNER_ID in .env file. It must be a numeric Discord ID.")
+        users = {entry[2] for entry in matches} | {message.author.id}
+        channels = {entry[3] for entry in matches} | {message.channel.id}
+        if len(users) == 1 and len(channels) == 1:
+            return False  # one user repeating in one channel is left to check_spam
+        return True
 
-        BOT_OWNER_ID = int(BOT_OWNER_ID)
+    def check_caps(self, content: str, config: AutoModConfig) -> bool:
+        caps_ratio = sum(1 for c in content if c.isupper()) / len(content)
+        return caps_ratio > config.caps_threshold
 
-        if message.author.guild_permissions.manage_messages or message.author.id == BOT_OWNER_ID:
-            return False
-
-        words = message.content.lower().split()
-        for word in words:
-        
-            if any(link in word for link in ['http://', 'https://', 'discord.gg']):
-            
-                if not any(allowed in word for allowed in self.link_whitelist):
-              
-                    await message.delete()
-                    await self.send_warning(message.channel, message.author, "links")
-                    return True
+    def check_links(self, content: str, config: AutoModConfig) -> bool:
+        for match in URL_PATTERN.finditer(content):
+            if not config.link_whitelist_trie.allows(match.group(0)):
+                return True
         return False
 
-    async def check_banned_words(self, message):
-        if any(word in message.content.lower() for word in self.banned_words):
-            await message.delete()
-            await self.send_warning(message.channel, message.author, "banned_words")
+    def check_banned_words(self, message, text: str, folded: str, config: AutoModConfig) -> bool:
+        word = config.banned_matcher.find(text)
+        if word is None and AMBIGUOUS_GLYPHS.search(folded):  # "s1ut", "f**k": readings the fast pass skipped
+            word = config.banned_matcher.find_ambiguous(folded)
+        if word is not None:
+            print(f"Banned word '{word}' from {message.author} in {message.guild}")
             return True
         return False
 
-    async def send_warning(self, channel, user, violation_type):
+    async def send_warning(self, channel, user, violations: Dict[str, int]):
+        """Post one warning summarizing every violation a user had in the last flush window."""
         warnings = {
             "spam": "Please do not spam messages.",
             "caps": "Please avoid using excessive caps.",
             "links": "Unauthorized links are not allowed.",
-            "banned_words": "Please watch your language."
+            "banned_words": "Please watch your language.",
+            "duplicate": "This message was already posted several times."
         }
 
         embed = EmbedBuilder(
             "⚠️ Warning",
-            warnings.get(violation_type, "Rule violation detected.")
+            "\n".join(warnings.get(violation_type, "Rule violation detected.") for violation_type in violations)
         ).set_color(discord.Color.orange())
         
         embed.add_field("User", user.mention)
-        embed.add_field("Violation", violation_type.title())
+        embed.add_field("Violation", ", ".join(
+            violation_type.replace('_', ' ').title() + (f" ×{count}" if count > 1 else "")
+            for violation_type, count in violations.items()
+        ))
         
         await channel.send(embed=embed.build(), delete_after=10)
 
@@ -5935,8 +7953,9 @@ class AutoMod(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def automod(self, ctx, setting: str = None, value: str = None, timeout_minutes: int = None):
         """Configure AutoMod settings or display current settings and commands."""
+        config = self.config_for(ctx.guild.id)
         if timeout_minutes is None:
-            timeout_minutes = self.spam_timeout_minutes
+            timeout_minutes = config.spam_timeout_minutes
 
         if setting is None:
             embed = EmbedBuilder(
@@ -5944,15 +7963,17 @@ class AutoMod(commands.Cog):
                 "Here are the current AutoMod settings and available commands:"
             ).set_color(discord.Color.blue())
 
-            embed.add_field("Spam Threshold", f"{self.spam_threshold} messages in {self.spam_interval} seconds")
-            embed.add_field("Spam Timeout", f"{self.spam_timeout_minutes} minutes")
-            embed.add_field("Caps Threshold", f"{self.caps_threshold * 100}%")
+            embed.add_field("Spam Threshold", f"{config.spam_threshold} messages in {config.spam_interval} seconds")
+            embed.add_field("Spam Timeout", f"{config.spam_timeout_minutes} minutes")
+            embed.add_field("Duplicate Threshold", f"{config.duplicate_threshold} copies in {config.duplicate_window} seconds")
+            embed.add_field("Caps Threshold", f"{config.caps_threshold * 100}%")
+            embed.add_field("Shadow Mode", "On, no actions are taken" if config.shadow_mode else "Off")
 
-            whitelist_display = "\n".join(list(self.link_whitelist)[:5]) if self.link_whitelist else "None"
+            whitelist_display = "\n".join(sorted(config.link_whitelist)[:5]) if config.link_whitelist else "None"
             embed.add_field("Whitelisted Links (First 5)", whitelist_display)
 
-            banned_words_display = "\n".join(list(self.banned_words)[:5]) if self.banned_words else "None"
-            embed.add_field("Banned Words (First 5)", banned_words_display)
+            banned_words_display = "\n".join(sorted(config.banned_words)[:5]) if config.banned_words else "Built-in list only"
+            embed.add_field("Server Banned Words (First 5)", banned_words_display)
 
             commands_explanation = (
                 "**Commands:**\n"
@@ -5960,6 +7981,8 @@ class AutoMod(commands.Cog):
                 "`!automod spam_threshold <value> [timeout_minutes]` - Set the number of messages allowed before spam detection and the timeout duration.\n"
                 "`!automod add_banned_word <word>` - Add a word to the banned words list.\n"
                 "`!automod add_whitelist <url>` - Add a URL to the link whitelist.\n"
+                "`!automod stats` - Show how often each check ran, matched and how long it took.\n"
+                "`!automod shadow <on/off>` - Run the checks without acting and list what would have been removed in `!automod stats`.\n"
                 "`!automod` - Display the current AutoMod settings and available commands."
             )
             embed.add_field("Available Commands", commands_explanation)
@@ -5967,9 +7990,47 @@ class AutoMod(commands.Cog):
             await ctx.send(embed=embed.build())
             return
 
+        if setting == 'stats':
+            embed = EmbedBuilder(
+                "📊 AutoMod Check Statistics",
+                f"{self.messages_seen} messages seen, {self.messages_exempt} skipped as exempt"
+            ).set_color(discord.Color.blue())
+
+            for name, stats in self.check_stats.items():
+                average_us = stats["total_ns"] / stats["calls"] / 1000 if stats["calls"] else 0
+                embed.add_field(
+                    name.replace('_', ' ').title(),
+                    f"Runs: {stats['calls']}\nHits: {stats['hits']}\n"
+                    f"Avg: {average_us:.1f} µs\nMax: {stats['max_ns'] / 1000:.1f} µs"
+                )
+
+            verdicts = [verdict for verdict in self.shadow_verdicts if verdict[1] == ctx.guild.id][-5:]
+            if verdicts:
+                embed.add_field("Shadow Verdicts (Last 5)", "\n".join(
+                    f"{at:%H:%M:%S} <@{user_id}> in <#{channel_id}>: {violation} `{content[:40]}`"
+                    for at, _, channel_id, user_id, violation, content in verdicts
+                ), inline=False)
+
+            await ctx.send(embed=embed.build())
+            return
+
+        if setting == 'shadow':
+            if value not in ('on', 'off'):
+                return await ctx.send("Use `!automod shadow on` or `!automod shadow off`.")
+            await self.update_guild_config(ctx.guild.id, {'shadow_mode': value == 'on'})
+            embed = EmbedBuilder(
+                "⚙️ AutoMod Updated",
+                "Shadow mode is on: checks record verdicts but nothing is deleted, timed out or warned."
+                if value == 'on' else "Shadow mode is off: AutoMod acts on violations again."
+            ).set_color(discord.Color.green()).build()
+            await ctx.send(embed=embed)
+            return
+
         settings = {
             'caps_threshold': float,
             'spam_threshold': int,
+            'duplicate_threshold': int,
+            'duplicate_window': float,
             'add_banned_word': str,
             'add_whitelist': str
         }
@@ -5979,26 +8040,30 @@ class AutoMod(commands.Cog):
 
         try:
             if setting == 'spam_threshold':
-                self.spam_check = {}
-                self.spam_threshold = int(value)
-                self.spam_timeout_minutes = timeout_minutes
+                await self.update_guild_config(ctx.guild.id, {
+                    'spam_threshold': int(value),
+                    'spam_timeout_minutes': timeout_minutes
+                })
+                self.spam_windows = {key: window for key, window in self.spam_windows.items() if key[0] != ctx.guild.id}
 
                 embed = EmbedBuilder(
                     "⚙️ AutoMod Spam Settings Updated",
-                    f"Threshold: {value} messages in {self.spam_interval} seconds\nTimeout: {timeout_minutes} minutes"
+                    f"Threshold: {value} messages in {config.spam_interval} seconds\nTimeout: {timeout_minutes} minutes"
                 ).set_color(discord.Color.green()).build()
 
             elif setting in ['add_banned_word', 'add_whitelist']:
                 if setting == 'add_banned_word':
-                    self.banned_words.add(value.lower())
+                    words = sorted(config.banned_words | {value.lower()})
+                    await self.update_guild_config(ctx.guild.id, {'banned_words': words})
                 else:
-                    self.link_whitelist.add(value.lower())
+                    entries = sorted(config.link_whitelist | {value.lower()})
+                    await self.update_guild_config(ctx.guild.id, {'link_whitelist': entries})
                 embed = EmbedBuilder(
                     "⚙️ AutoMod Updated",
                     f"Setting `{setting}` updated with value `{value}`"
                 ).set_color(discord.Color.green()).build()
             else:
-                setattr(self, setting, settings[setting](value))
+                await self.update_guild_config(ctx.guild.id, {setting: settings[setting](value)})
                 embed = EmbedBuilder(
                     "⚙️ AutoMod Updated",
                     f"Setting `{setting}` updated to `{value}`"
@@ -6137,6 +8202,9 @@ class WelcomeSystem(commands.Cog):
 
     @commands.Cog.listener()
     async def on_member_join(self, member):
+        server_management = self.bot.get_cog("ServerManagement")
+        if server_management and server_management.in_raid_mode(member.guild.id):
+            return  # no welcome embed during a raid; ServerManagement gives the autorole once it ends
     
         config = self.welcome_configs.get(member.guild.id, {})
         channel_id = config.get("channel_id")
@@ -7367,12 +9435,14 @@ if __name__ == "__main__":
     )
     @bot.event
     async def on_message(message):
-        await bot.webhook_logger.log_message(message)
+        if bot.webhook_logger:
+            bot.webhook_logger.log_message(message)
         await bot.process_commands(message)
 
     @bot.event 
     async def on_command(ctx):
-        await bot.webhook_logger.log_command(ctx)
+        if bot.webhook_logger:
+            bot.webhook_logger.log_command(ctx)
 
     try:
         bot.run(TOKEN)
@@ -0,0 +1,249 @@
+"""
+Replay harness for the AutoMod message path.
+
+Pushes a JSONL corpus of messages through AutoMod.check_message in shadow
+mode, using fake discord objects (no network, no gateway), so nothing is
+deleted, timed out or warned. Reports messages/sec, per-check CPU time and
+hit counts per rule, and, for lines that carry an "expected" label, how
+often each rule agreed with it.
+
+Corpus lines look like:
+    {"content": "hello", "author_id": 1, "channel_id": 10, "guild_id": 100,
+     "timestamp": 12.5, "expected": null}
+Only "content" is required. "timestamp" is in seconds and drives the spam
+and duplicate windows; without it messages are spaced --interval apart.
+"expected" is the violation the message should raise ("spam", "caps",
+"links", "banned_words", "duplicate") or null for a clean message.
+
+Usage:
+    python benchmarks/bench_automod.py
+    python benchmarks/bench_automod.py --corpus messages.jsonl
+    python benchmarks/bench_automod.py --generate 200000 --write-corpus synthetic.jsonl
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GUILD_ID = 1000000000000000000
+
+WORDS = (
+    "the a to and of you it is that in for on this with have be are was but not just so like what "
+    "game play server today tomorrow anyone know how does work really good nice thanks help time "
+    "later back new update patch match team voice chat music stream watch build fix try again"
+).split()
+CAPS = ["WHY IS NOBODY ANSWERING ME", "THIS GAME IS SO BROKEN RIGHT NOW", "LETS GOOOO WE WON THE MATCH"]
+LINKS = ["check https://example.com/giveaway", "join discord.gg/freestuff now", "look at http://bit.ly/abc123"]
+BANNED = ["you are a fucking idiot", "shut up b1tch", "f.u.c.k this game"]
+RAID = "everyone go vote for our server on the list before the weekend event starts"
+
+
+class ReplayClock:
+    """Stands in for the time module inside Main_bot_3 so windows follow corpus timestamps, not wall time."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.perf_counter_ns = time.perf_counter_ns
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+class FakePermissions:
+    manage_messages = False
+
+
+class FakeMember:
+    def __init__(self, member_id):
+        self.id = member_id
+        self.bot = False
+        self.guild_permissions = FakePermissions()
+        self.mention = f"<@{member_id}>"
+
+    def __str__(self):
+        return f"user{self.id}"
+
+
+class FakeGuild:
+    def __init__(self, guild_id):
+        self.id = guild_id
+
+    def __str__(self):
+        return f"guild{self.id}"
+
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+
+
+class FakeMessage:
+    def __init__(self, content, author, guild, channel):
+        self.content = content
+        self.author = author
+        self.guild = guild
+        self.channel = channel
+
+
+class FakeBot:
+    """Just enough of commands.Bot for AutoMod to run offline."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.user = None
+
+    def get_cog(self, name):
+        return None
+
+
+def generate_corpus(count, seed):
+    """A chat stream with occasional caps, links, banned words, a spammer and a copy-paste raid."""
+    random.seed(seed)
+    lines = []
+    now = 0.0
+    raid_at = count // 2
+    for i in range(count):
+        now += random.expovariate(5)  # about five messages a second across the guild
+        roll = random.random()
+        line = {'author_id': random.randint(1, 2000), 'channel_id': random.randint(1, 20), 'timestamp': now}
+        if raid_at <= i < raid_at + 30:
+            line.update(content=f"{RAID} {random.randint(1, 99)}", expected="duplicate" if i >= raid_at + 4 else None)
+        elif roll < 0.02:
+            line.update(content=random.choice(CAPS), expected="caps")
+        elif roll < 0.03:
+            line.update(content=random.choice(LINKS), expected="links")
+        elif roll < 0.04:
+            line.update(content=random.choice(BANNED), expected="banned_words")
+        elif roll < 0.045:
+            # a burst from one account, labels left off because which message trips the window depends on timing
+            for _ in range(8):
+                lines.append({'content': "hey", 'author_id': 999999, 'channel_id': 1, 'timestamp': now})
+                now += 0.3
+            continue
+        else:
+            line.update(content=" ".join(random.choices(WORDS, k=random.randint(2, 14))), expected=None)
+        lines.append(line)
+    return lines
+
+
+def load_corpus(path, interval):
+    lines = []
+    with open(path, 'r') as f:
+        for number, raw in enumerate(f):
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                line = json.loads(raw)
+            except json.JSONDecodeError:
+                print(f"Skipping line {number + 1}: invalid JSON")
+                continue
+            line.setdefault('timestamp', number * interval)
+            lines.append(line)
+    return lines
+
+
+async def replay(lines):
+    import Main_bot_3
+
+    clock = ReplayClock()
+    Main_bot_3.time = clock
+    cog = Main_bot_3.AutoMod(FakeBot(asyncio.get_running_loop()))
+    cog.default_config = cog.default_config._replace(shadow_mode=True)
+
+    members, guilds, channels = {}, {}, {}
+    messages = []
+    for line in lines:
+        author_id = int(line.get('author_id', 1))
+        guild_id = int(line.get('guild_id', GUILD_ID))
+        channel_id = int(line.get('channel_id', 1))
+        author = members.get(author_id) or members.setdefault(author_id, FakeMember(author_id))
+        guild = guilds.get(guild_id) or guilds.setdefault(guild_id, FakeGuild(guild_id))
+        channel = channels.get(channel_id) or channels.setdefault(channel_id, FakeChannel(channel_id))
+        messages.append((float(line['timestamp']), FakeMessage(line['content'], author, guild, channel)))
+
+    verdicts = []
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # the checks print every banned word they find
+        for timestamp, message in messages:
+            clock.now = timestamp
+            verdicts.append(await cog.check_message(message))
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    if cog.enforcement_queues:
+        print("warning: shadow mode queued enforcement actions")
+    return cog, verdicts, elapsed, cpu
+
+
+def report(lines, cog, verdicts, elapsed, cpu):
+    count = len(lines)
+    print(f"AutoMod corpus replay ({datetime.now():%Y-%m-%d %H:%M})")
+    print(f"{count:,} messages in {elapsed:.2f}s wall / {cpu:.2f}s CPU: {count / elapsed if elapsed else 0:,.0f} msg/s")
+    print(f"{cog.messages_exempt:,} exempt, {sum(1 for v in verdicts if v):,} flagged")
+    print()
+    print(f"{'check':<14}{'runs':>10}{'hits':>8}{'CPU ms':>10}{'avg us':>9}{'max us':>9}{'share':>8}")
+    total_ns = sum(stats['total_ns'] for stats in cog.check_stats.values()) or 1
+    for name, stats in sorted(cog.check_stats.items(), key=lambda item: -item[1]['total_ns']):
+        average = stats['total_ns'] / stats['calls'] / 1000 if stats['calls'] else 0
+        print(
+            f"{name:<14}{stats['calls']:>10,}{stats['hits']:>8,}{stats['total_ns'] / 1e6:>10.1f}"
+            f"{average:>9.1f}{stats['max_ns'] / 1000:>9.1f}{stats['total_ns'] / total_ns:>8.1%}"
+        )
+
+    labelled = [(line['expected'], verdict) for line, verdict in zip(lines, verdicts) if 'expected' in line]
+    if not labelled:
+        return
+    print()
+    print(f"Agreement with {len(labelled):,} labelled messages")
+    print(f"{'rule':<14}{'expected':>10}{'caught':>8}{'missed':>8}{'false +':>9}")
+    rules = sorted({rule for pair in labelled for rule in pair if rule})
+    for rule in rules:
+        expected = sum(1 for want, _ in labelled if want == rule)
+        caught = sum(1 for want, got in labelled if want == rule and got == rule)
+        false_positive = sum(1 for want, got in labelled if got == rule and want != rule)
+        print(f"{rule:<14}{expected:>10,}{caught:>8,}{expected - caught:>8,}{false_positive:>9,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', help='JSONL file to replay; a synthetic stream is generated when omitted')
+    parser.add_argument('--generate', type=int, default=100000, help='messages in the synthetic stream')
+    parser.add_argument('--write-corpus', help='save the synthetic stream as JSONL and exit')
+    parser.add_argument('--interval', type=float, default=0.2, help='seconds between corpus lines without a timestamp')
+    parser.add_argument('--seed', type=int, default=1234)
+    args = parser.parse_args()
+
+    if args.corpus:
+        lines = load_corpus(args.corpus, args.interval)
+    else:
+        lines = generate_corpus(args.generate, args.seed)
+    if args.write_corpus:
+        with open(args.write_corpus, 'w') as f:
+            for line in lines:
+                f.write(json.dumps(line) + "\n")
+        return
+
+    sys.path.insert(0, ROOT)
+    os.environ.setdefault('BOT_OWNER_ID', '0')
+    os.environ.setdefault('TRUSTED_GUILDS', '0')
+    os.chdir(tempfile.mkdtemp(prefix="bench_automod_"))  # keep automod_config.json out of the repo
+
+    cog, verdicts, elapsed, cpu = asyncio.run(replay(lines))
+    report(lines, cog, verdicts, elapsed, cpu)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+Benchmark / replay harness for the LevelingSystem message path.
+
+Feeds a synthetic message stream through LevelingSystem.on_message using
+fake discord objects (no network, no gateway) and reports throughput,
+per-message latency, bytes written and peak RSS for each guild size.
+
+Usage:
+    python benchmarks/bench_leveling.py
+    python benchmarks/bench_leveling.py --users 1000,100000 --messages 50000 --storage sqlite
+"""
+import argparse
+import asyncio
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GUILD_ID = 1000000000000000000
+
+
+class FakeMember:
+    def __init__(self, member_id, guild):
+        self.id = member_id
+        self.guild = guild
+        self.bot = False
+        self.roles = []
+        self.display_name = f"user{member_id}"
+
+    def get_role(self, role_id):
+        return None
+
+
+class FakeGuild:
+    def __init__(self, guild_id):
+        self.id = guild_id
+        self.members = {}
+
+    def get_member(self, member_id):
+        member = self.members.get(member_id)
+        if member is None:
+            member = self.members[member_id] = FakeMember(member_id, self)
+        return member
+
+    def get_role(self, role_id):
+        return None
+
+
+class FakeMessage:
+    def __init__(self, author, guild, content):
+        self.author = author
+        self.guild = guild
+        self.content = content
+
+
+class FakeBot:
+    """Just enough of commands.Bot for LevelingSystem to run offline."""
+
+    def __init__(self, loop, guild):
+        self.loop = loop
+        self.guild = guild
+        self.user = None
+        self._ready = asyncio.Event()  # never set, so the cog's periodic tasks stay idle
+
+    async def wait_until_ready(self):
+        await self._ready.wait()
+
+    def is_closed(self):
+        return False
+
+    def get_guild(self, guild_id):
+        return self.guild if guild_id == self.guild.id else None
+
+    def get_channel(self, channel_id):
+        return None
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def io_bytes_written(cog):
+    """Bytes this process handed to write(); falls back to the JSON store's own counter."""
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                if line.startswith('wchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return cog.store.bytes_written
+
+
+async def run_once(users, messages, drain_every, seed):
+    import Main_bot_3
+
+    random.seed(seed)
+    loop = asyncio.get_running_loop()
+    guild = FakeGuild(GUILD_ID)
+    bot = FakeBot(loop, guild)
+
+    cog = Main_bot_3.LevelingSystem(bot)
+    cog.xp_cooldown = 0  # every message grants XP, the worst case for the store
+
+    now = int(time.time())
+    base_id = 100000000000000000
+    cog.backend.load({
+        str(GUILD_ID): {
+            str(base_id + i): {'xp': random.randint(0, 50000), 'last_message': now - random.randint(0, 30 * 86400)}
+            for i in range(users)
+        }
+    })
+    cog.save_data()
+    await cog.store.flush()
+
+    bytes_before = io_bytes_written(cog)
+
+    latencies = []
+    drain_ns = 0
+    start = time.perf_counter_ns()
+    for i in range(messages):
+        # skewed author distribution: a small share of users sends most messages
+        author = guild.get_member(base_id + int(users * random.random() ** 3))
+        message = FakeMessage(author, guild, "hello world")
+
+        t0 = time.perf_counter_ns()
+        await cog.on_message(message)
+        latencies.append(time.perf_counter_ns() - t0)
+
+        if (i + 1) % drain_every == 0:
+            t0 = time.perf_counter_ns()
+            await cog.drain_pending_xp()
+            drain_ns += time.perf_counter_ns() - t0
+
+    t0 = time.perf_counter_ns()
+    await cog.drain_pending_xp()
+    await cog.store.flush()
+    drain_ns += time.perf_counter_ns() - t0
+    elapsed = (time.perf_counter_ns() - start) / 1e9
+    bytes_written = io_bytes_written(cog) - bytes_before
+
+    for task in cog.tasks + list(cog.level_up_workers.values()):
+        task.cancel()
+    await cog.store.close()
+    cog.backend.close()
+
+    latencies.sort()
+    return {
+        'users': users,
+        'messages': messages,
+        'storage': cog.storage_mode,
+        'msgs_per_sec': messages / elapsed if elapsed else 0,
+        'p50_us': percentile(latencies, 50) / 1000,
+        'p99_us': percentile(latencies, 99) / 1000,
+        'drain_us_per_msg': drain_ns / messages / 1000,
+        'bytes_written': bytes_written,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_single(args):
+    sys.path.insert(0, ROOT)
+    os.environ.setdefault('BOT_OWNER_ID', '0')
+    os.environ.setdefault('TRUSTED_GUILDS', '0')
+    os.environ['LEVELING_STORAGE'] = args.storage
+    workdir = tempfile.mkdtemp(prefix="bench_leveling_")
+    os.chdir(workdir)  # keep leveling_data.* out of the repo
+
+    result = asyncio.run(run_once(int(args.users), args.messages, args.drain_every, args.seed))
+    print(
+        f"{result['storage']:<7}{result['users']:>10,}{result['messages']:>10,}"
+        f"{result['msgs_per_sec']:>12,.0f}{result['p50_us']:>10.1f}{result['p99_us']:>10.1f}"
+        f"{result['drain_us_per_msg']:>14.1f}{result['bytes_written']:>14,}{result['peak_rss_mb']:>10.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', default='1000,100000,1000000', help='comma separated guild sizes')
+    parser.add_argument('--messages', type=int, default=100000, help='messages per run')
+    parser.add_argument('--drain-every', type=int, default=500, help='messages between accumulator drains')
+    parser.add_argument('--storage', choices=['json', 'sqlite'], default='json')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--single', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        run_single(args)
+        return
+
+    print(f"LevelingSystem message path benchmark ({datetime.now():%Y-%m-%d %H:%M})")
+    print(
+        f"{'store':<7}{'users':>10}{'messages':>10}{'msg/s':>12}{'p50 us':>10}{'p99 us':>10}"
+        f"{'drain us/msg':>14}{'bytes written':>14}{'RSS MB':>10}"
+    )
+    for users in args.users.split(','):
+        # one process per size so peak RSS is not inherited from a larger run
+        subprocess.run([
+            sys.executable, os.path.abspath(__file__), '--single',
+            '--users', users, '--messages', str(args.messages),
+            '--drain-every', str(args.drain_every), '--storage', args.storage, '--seed', str(args.seed)
+        ], check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Regression check for the AutoMod banned-word matcher.
+
+banned_variants.txt holds every spelling the old hand-written banned list
+carried ("s1ut", "f**k", "h@tl3r", ...), one per line. The list was cut
+down to canonical roots when the Aho-Corasick matcher landed; this script
+runs each old spelling through AutoMod.check_banned_words, the same way
+scan_message does, and lists the ones that no longer match.
+
+Exits non-zero when anything is missed.
+
+Usage:
+    python benchmarks/check_banned_variants.py
+    python benchmarks/check_banned_variants.py --variants more_variants.txt
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+from bench_automod import FakeBot, FakeChannel, FakeGuild, FakeMember, FakeMessage
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VARIANTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "banned_variants.txt")
+
+
+async def find_misses(variants):
+    import Main_bot_3
+
+    cog = Main_bot_3.AutoMod(FakeBot(asyncio.get_running_loop()))
+    config = cog.default_config
+    message = FakeMessage("", FakeMember(1), FakeGuild(1), FakeChannel(1))
+    misses = []
+    with contextlib.redirect_stdout(io.StringIO()):  # check_banned_words prints every hit
+        for variant in variants:
+            folded = Main_bot_3.fold_text(variant)
+            text = folded.translate(Main_bot_3.NORMALIZE_TABLE)
+            if not cog.check_banned_words(message, text, folded, config):
+                misses.append(variant)
+    return misses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--variants', default=VARIANTS, help='file with one spelling per line')
+    args = parser.parse_args()
+
+    with open(args.variants, 'r', encoding='utf-8') as f:
+        variants = [line.rstrip("\n") for line in f if line.strip()]
+
+    sys.path.insert(0, ROOT)
+    os.environ.setdefault('BOT_OWNER_ID', '0')
+    os.environ.setdefault('TRUSTED_GUILDS', '0')
+    os.chdir(tempfile.mkdtemp(prefix="check_banned_"))  # keep automod_config.json out of the repo
+
+    misses = asyncio.run(find_misses(variants))
+    print(f"{len(variants) - len(misses):,} of {len(variants):,} variants matched")
+    for variant in misses:
+        print(f"  missed: {variant}")
+    sys.exit(1 if misses else 0)
+
+
+if __name__ == '__main__':
+    main()